@@ -0,0 +1,349 @@
+import json
+import operator
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from task_baselines import TaskBaselineStore, get_default_baseline_store
+
+# Default monitoring rules, expressed as data. Each rule's 'when' maps a
+# metadata field (or 'list_field.key' for lists of dicts, 'dict_field.key'
+# for dicts such as line_kinds, e.g. 'line_kinds.FATAL') to either a value
+# it must equal or a dict of operators that must all hold:
+#   eq, ne, in, truthy, gt, ge, lt, le           - scalar field
+#   contains, contains_any, min_len, distinct_min,
+#   any_gt, any_ge, any_lt, any_le,
+#   count_of: {"values": [...], "min": n}         - list field
+#   above_baseline: {"quantile": q, "fallback_seconds": s}
+#                                                 - task_timings: any task slower
+#                                                   than its q baseline (s seconds
+#                                                   while it has too little history)
+# 'statuses' and 'error_types' are read from their {name: count} form
+# ('status_counts', 'error_type_counts') when the metadata has it; the list
+# operators then cost one lookup per named value instead of a scan.
+# 'chunk_type' equality and 'has_error': true double as gates: the engine
+# only evaluates a rule for chunks whose chunk_type/has_error can match.
+DEFAULT_ALERT_RULES: List[Dict[str, Any]] = [
+    {
+        'name': 'playbook_completion_summary',
+        'when': {'chunk_type': 'RECAP'},
+        'severity': 'info',
+        'description': 'Playbook execution completed with summary statistics',
+        'natural_language': 'Notify when playbook completes and provide summary statistics'
+    },
+    {
+        'name': 'recap_with_failures',
+        'when': {
+            'chunk_type': 'RECAP',
+            'has_error': True,
+            'error_types': {'contains_any': ['TASK_FAILED_SUMMARY', 'HOST_UNREACHABLE_SUMMARY']}
+        },
+        'severity': 'critical',
+        'description': 'Playbook completed but has failed or unreachable hosts',
+        'natural_language': 'Critical alert when playbook summary shows failures or unreachable hosts'
+    },
+    {
+        'name': 'long_running_tasks',
+        'when': {
+            'chunk_type': 'RECAP',
+            'task_timings': {'above_baseline': {'quantile': 0.95, 'fallback_seconds': 300}}
+        },
+        'severity': 'medium',
+        'description': 'Tasks took longer than their p95 baseline (5 minutes without history)',
+        'natural_language': 'Alert when tasks exceed normal execution time baselines'
+    },
+    {
+        'name': 'unreachable_hosts',
+        'when': {'has_error': True, 'error_types': {'contains': 'HOST_UNREACHABLE'}},
+        'severity': 'critical',
+        'description': 'Host became unreachable during Ansible execution',
+        'natural_language': 'Page me if any host shows UNREACHABLE status'
+    },
+    {
+        'name': 'failed_tasks',
+        'when': {'has_error': True, 'error_types': {'contains': 'TASK_FAILED'}},
+        'severity': 'high',
+        'description': 'Ansible task execution failed',
+        'natural_language': 'Alert when Ansible tasks fail'
+    },
+    {
+        'name': 'retry_failures',
+        'when': {
+            'has_error': True,
+            'error_types': {'contains': 'RETRY_FAILURE'},
+            'retry_counts': {'any_lt': 3}
+        },
+        'severity': 'medium',
+        'description': 'Task is retrying with few attempts remaining',
+        'natural_language': 'Notify if task retries are running low'
+    },
+    {
+        'name': 'multiple_task_failures',
+        'when': {
+            'has_error': True,
+            'statuses': {'count_of': {'values': ['FAILED', 'UNREACHABLE'], 'min': 2}}
+        },
+        'severity': 'critical',
+        'description': 'Multiple tasks failed in the same execution block',
+        'natural_language': 'Critical alert when multiple tasks fail in sequence'
+    },
+    {
+        'name': 'mixed_statuses',
+        'when': {
+            'has_error': True,
+            'statuses': {'contains': 'FAILED', 'distinct_min': 3}
+        },
+        'severity': 'medium',
+        'description': 'Mixed success and failure statuses in task execution',
+        'natural_language': 'Alert when task block has mixed success/failure results'
+    },
+    {
+        'name': 'playbook_duration_anomaly',
+        'when': {'playbook_name': {'truthy': True}, 'durations': {'min_len': 1}},
+        'severity': 'low',
+        'description': 'Playbook execution time may exceed baseline',
+        'natural_language': 'Alert if playbook duration exceeds normal baseline'
+    }
+]
+
+# Environment variable naming a JSON rules file merged into the defaults
+ALERT_RULES_ENV = 'ANSIBLE_ALERT_RULES'
+
+_COMPARISONS = {
+    'gt': operator.gt,
+    'ge': operator.ge,
+    'lt': operator.lt,
+    'le': operator.le,
+}
+
+
+# List fields that metadata may carry as counters instead
+_COUNTER_FIELDS = {
+    'statuses': 'status_counts',
+    'error_types': 'error_type_counts',
+}
+
+
+def _field_getter(field: str) -> Callable[[Dict[str, Any]], Any]:
+    """Build an accessor for 'field', 'list_field.key' or 'dict_field.key'."""
+    counts_field = _COUNTER_FIELDS.get(field)
+    if counts_field:
+        def get_counted(m):
+            counts = m.get(counts_field)
+            return m.get(field) if counts is None else counts
+        return get_counted
+    if '.' not in field:
+        return lambda m: m.get(field)
+    list_field, key = field.split('.', 1)
+
+    def get_nested(m):
+        value = m.get(list_field)
+        if isinstance(value, dict):
+            return value.get(key)
+        return [item[key] for item in value or ()]
+    return get_nested
+
+
+def _compile_operator(op: str, arg: Any,
+                      baselines: Optional[TaskBaselineStore] = None) -> Callable[[Any], bool]:
+    """
+    Compile one operator into a predicate over the field value.
+
+    List operators also accept a {name: count} dict standing for the list
+    in which each name repeats count times. above_baseline reads the
+    baselines store at evaluation time, so it sees durations observed
+    after the rules were compiled.
+    """
+    if op == 'eq':
+        return lambda value: value == arg
+    if op == 'ne':
+        return lambda value: value != arg
+    if op == 'in':
+        allowed = frozenset(arg)
+        return lambda value: value in allowed
+    if op == 'truthy':
+        return lambda value: bool(value) == bool(arg)
+    if op in _COMPARISONS:
+        compare = _COMPARISONS[op]
+        return lambda value: value is not None and compare(value, arg)
+    if op.startswith('any_') and op[4:] in _COMPARISONS:
+        compare = _COMPARISONS[op[4:]]
+        return lambda value: any(compare(item, arg) for item in value or ())
+    if op == 'contains':
+        return lambda value: value is not None and arg in value
+    if op == 'contains_any':
+        wanted = frozenset(arg)
+        return lambda value: any(item in wanted for item in value or ())
+    if op == 'min_len':
+        return lambda value: (sum(value.values()) if isinstance(value, dict) else len(value or ())) >= arg
+    if op == 'distinct_min':
+        return lambda value: len(value if isinstance(value, dict) else set(value or ())) >= arg
+    if op == 'count_of':
+        wanted = frozenset(arg['values'])
+        minimum = arg['min']
+
+        def count_of(value):
+            if isinstance(value, dict):
+                return sum(value.get(item, 0) for item in wanted) >= minimum
+            return sum(1 for item in value or () if item in wanted) >= minimum
+        return count_of
+    if op == 'above_baseline':
+        quantile = arg.get('quantile', 0.95)
+        fallback = arg.get('fallback_seconds')
+        if baselines is None:
+            return lambda value: fallback is not None and any(
+                item['duration_seconds'] > fallback for item in value or ())
+        return lambda value: any(
+            baselines.is_slow(item['task'], item['duration_seconds'], quantile, fallback)
+            for item in value or ())
+    raise ValueError(f"Unknown alert rule operator: {op!r}")
+
+
+def _compile_condition(when: Dict[str, Any],
+                       baselines: Optional[TaskBaselineStore] = None) -> Callable[[Dict[str, Any]], bool]:
+    """Compile a rule's 'when' mapping into a single metadata predicate."""
+    checks: List[Tuple[Callable[[Dict[str, Any]], Any], Callable[[Any], bool]]] = []
+    for field, spec in when.items():
+        getter = _field_getter(field)
+        operators = spec if isinstance(spec, dict) else {'eq': spec}
+        for op, arg in operators.items():
+            checks.append((getter, _compile_operator(op, arg, baselines)))
+
+    def condition(metadata: Dict[str, Any]) -> bool:
+        for getter, predicate in checks:
+            if not predicate(getter(metadata)):
+                return False
+        return True
+
+    return condition
+
+
+class AlertRule:
+    """A declarative alert rule compiled into a predicate."""
+
+    __slots__ = ('name', 'when', 'chunk_type', 'requires_error', 'condition', 'pattern')
+
+    def __init__(self, spec: Dict[str, Any], baselines: Optional[TaskBaselineStore] = None):
+        if 'name' not in spec or 'when' not in spec:
+            raise ValueError(f"Alert rule needs 'name' and 'when': {spec!r}")
+        self.name = spec['name']
+        self.when = spec['when']
+        # Gates used by the engine to skip rules that cannot match a chunk
+        chunk_type = self.when.get('chunk_type')
+        self.chunk_type = chunk_type if isinstance(chunk_type, str) else None
+        self.requires_error = self.when.get('has_error') is True
+        self.condition = _compile_condition(self.when, baselines)
+        # Shape kept compatible with the alert patterns callers already use
+        self.pattern = {key: value for key, value in spec.items() if key != 'name'}
+        self.pattern['condition'] = self.condition
+
+
+class AlertRuleEngine:
+    """
+    Evaluates a set of compiled alert rules against chunk metadata.
+
+    Rules are bucketed by the chunk_type and has_error values they can
+    match, so each chunk is checked in one pass against only the rules that
+    apply to it.
+    """
+
+    def __init__(self, rules: List[AlertRule]):
+        self.rules = rules
+        self._candidates: Dict[Tuple[Any, bool], List[AlertRule]] = {}
+
+    def candidates(self, chunk_type: Any, has_error: bool) -> List[AlertRule]:
+        """Rules whose gates allow the given chunk_type and has_error."""
+        key = (chunk_type, has_error)
+        rules = self._candidates.get(key)
+        if rules is None:
+            rules = [
+                rule for rule in self.rules
+                if (rule.chunk_type is None or rule.chunk_type == chunk_type)
+                and (has_error or not rule.requires_error)
+            ]
+            self._candidates[key] = rules
+        return rules
+
+    def evaluate(self, metadata_chunks: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Match every chunk against the rules in a single pass.
+
+        Args:
+            metadata_chunks: List of metadata dictionaries from chunk processing
+
+        Returns:
+            Mapping of rule name to the chunks that triggered it, in rule order
+        """
+        matches: Dict[str, List[Dict[str, Any]]] = {rule.name: [] for rule in self.rules}
+        for metadata in metadata_chunks:
+            for rule in self.candidates(metadata.get('chunk_type'), bool(metadata.get('has_error'))):
+                if rule.condition(metadata):
+                    matches[rule.name].append(metadata)
+        return {name: chunks for name, chunks in matches.items() if chunks}
+
+
+def compile_alert_rules(rules: List[Dict[str, Any]],
+                        baselines: Optional[TaskBaselineStore] = None) -> AlertRuleEngine:
+    """
+    Compile declarative rule specs into an AlertRuleEngine.
+
+    Args:
+        rules: List of rule dictionaries (see DEFAULT_ALERT_RULES)
+        baselines: Task duration baselines for above_baseline conditions;
+                   without one they use their fallback_seconds
+
+    Returns:
+        AlertRuleEngine ready to evaluate metadata
+
+    Raises:
+        ValueError: If a rule is malformed or uses an unknown operator
+    """
+    return AlertRuleEngine([AlertRule(spec, baselines) for spec in rules])
+
+
+def load_alert_rules(path: str) -> List[Dict[str, Any]]:
+    """
+    Load rule specs from a JSON file.
+
+    The file holds either a list of rules or an object with a 'rules' list.
+
+    Args:
+        path: Path to the JSON rules file
+
+    Returns:
+        List of rule dictionaries
+    """
+    with open(path, 'r') as file:
+        data = json.load(file)
+    return data['rules'] if isinstance(data, dict) else data
+
+
+def merge_alert_rules(base: List[Dict[str, Any]], custom: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Overlay custom rules on base rules; same-named rules are replaced."""
+    merged = {rule['name']: rule for rule in base}
+    for rule in custom:
+        merged[rule['name']] = rule
+    return list(merged.values())
+
+
+_default_engine: Optional[AlertRuleEngine] = None
+
+
+def get_default_alert_engine() -> AlertRuleEngine:
+    """
+    Return the engine for DEFAULT_ALERT_RULES, compiled once per process.
+
+    If the ANSIBLE_ALERT_RULES environment variable names a JSON rules file,
+    its rules are merged over the defaults. Duration rules use
+    get_default_baseline_store() (see ANSIBLE_TASK_BASELINES).
+
+    Returns:
+        Shared AlertRuleEngine
+    """
+    global _default_engine
+    if _default_engine is None:
+        rules = DEFAULT_ALERT_RULES
+        custom_path = os.environ.get(ALERT_RULES_ENV)
+        if custom_path:
+            rules = merge_alert_rules(rules, load_alert_rules(custom_path))
+        _default_engine = compile_alert_rules(rules, get_default_baseline_store())
+    return _default_engine
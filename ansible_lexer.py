@@ -0,0 +1,91 @@
+import re
+from typing import List, NamedTuple, Union
+
+# Span kinds emitted by the lexer. Every span starts at a structural
+# marker line and runs up to the next marker line, so continuation lines
+# (multiline JSON results, warnings, blank lines) stay with their header.
+PREAMBLE = "PREAMBLE"          # Text before the first marker line
+PLAY = "PLAY"                  # PLAY [name] ****
+TASK = "TASK"                  # TASK [name] ****
+HANDLER = "HANDLER"            # RUNNING HANDLER [name] ****
+TIMING = "TIMING"              # Friday 18 July 2025  21:16:32 +0000 (...)
+HOST_RESULT = "HOST_RESULT"    # ok: / changed: / skipping: / included: ...
+FATAL = "FATAL"                # fatal: [host]: FAILED! / UNREACHABLE!
+UNREACHABLE = "UNREACHABLE"    # UNREACHABLE! at the start of a line
+RETRY = "RETRY"                # FAILED - RETRYING: [host]: ...
+ERROR = "ERROR"                # ERROR! ...
+PLAY_RECAP = "PLAY_RECAP"      # PLAY RECAP ****
+HOST_STATS = "HOST_STATS"      # host : ok=1 changed=0 ... (PLAY RECAP rows)
+TASKS_RECAP = "TASKS_RECAP"    # TASKS RECAP ****
+
+# One alternation matched at line starts; the named group that matched is
+# the span kind, so the whole log is classified in a single regex pass.
+_MARKER_BODY = r"""(?:
+        (?P<PLAY_RECAP>PLAY\ RECAP\ \*)
+      | (?P<TASKS_RECAP>TASKS\ RECAP\ \*)
+      | (?P<PLAY>PLAY\ \[)
+      | (?P<TASK>TASK\ \[)
+      | (?P<HANDLER>RUNNING\ HANDLER\ \[)
+      | (?P<FATAL>fatal:\ \[)
+      | (?P<RETRY>FAILED\ -\ RETRYING:)
+      | (?P<UNREACHABLE>UNREACHABLE!)
+      | (?P<ERROR>ERROR!)
+      | (?P<HOST_RESULT>(?:ok|changed|skipping|failed|included|unreachable):\ )
+      | (?P<HOST_STATS>[\w.\-]+[ \t]*:[ \t]*ok=\d)
+      | (?P<TIMING>[A-Za-z]+\ \d+\ [A-Za-z]+\ \d{4}[ \t]+\d{2}:\d{2}:\d{2})
+    )"""
+
+# Anchoring on the preceding newline instead of ^ with re.MULTILINE lets the
+# regex engine skip ahead to line breaks rather than trying every offset.
+_MARKER_PATTERN = re.compile(r"\n" + _MARKER_BODY, re.VERBOSE)
+_FIRST_MARKER_PATTERN = re.compile(_MARKER_BODY, re.VERBOSE)
+
+# Byte-level twins for mmap'd or raw byte buffers; offsets are then bytes
+_MARKER_PATTERN_BYTES = re.compile(rb"\n" + _MARKER_BODY.encode(), re.VERBOSE)
+_FIRST_MARKER_PATTERN_BYTES = re.compile(_MARKER_BODY.encode(), re.VERBOSE)
+
+
+class LogSpan(NamedTuple):
+    """A contiguous region of the log that starts at a structural marker."""
+
+    kind: str
+    start: int
+    end: int
+
+
+def lex_ansible_log(text: Union[str, bytes, memoryview]) -> List[LogSpan]:
+    """
+    Tokenize an Ansible log into structural spans in one linear pass.
+
+    The spans tile the text exactly: the first span starts at offset 0,
+    each span ends where the next one starts, and the last span ends at
+    len(text). Splitters turn this shared span list into chunks without
+    rescanning the text for every delimiter level.
+
+    Args:
+        text: Raw Ansible log content, either as str or as any bytes-like
+              buffer (bytes, mmap); span offsets are in the same units
+
+    Returns:
+        List of LogSpan objects in document order
+    """
+    spans: List[LogSpan] = []
+    if not len(text):
+        return spans
+
+    if isinstance(text, str):
+        marker_pattern, first_marker_pattern = _MARKER_PATTERN, _FIRST_MARKER_PATTERN
+    else:
+        marker_pattern, first_marker_pattern = _MARKER_PATTERN_BYTES, _FIRST_MARKER_PATTERN_BYTES
+
+    first = first_marker_pattern.match(text)
+    kind = first.lastgroup if first else PREAMBLE
+    start = 0
+    for match in marker_pattern.finditer(text):
+        offset = match.start() + 1
+        spans.append(LogSpan(kind, start, offset))
+        kind = match.lastgroup
+        start = offset
+
+    spans.append(LogSpan(kind, start, len(text)))
+    return spans
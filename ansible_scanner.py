@@ -0,0 +1,224 @@
+import re
+from typing import Any, Iterable, List, Dict, Optional, Tuple
+
+# Status vocabulary in the order the metadata extractors report it, with the
+# error type each status implies (None for non-error statuses).
+STATUS_ORDER: Tuple[Tuple[str, Optional[str]], ...] = (
+    ('FAILED', 'TASK_FAILED'),
+    ('UNREACHABLE', 'HOST_UNREACHABLE'),
+    ('RETRYING', 'RETRY_FAILURE'),
+    ('CHANGED', None),
+    ('OK', None),
+    ('SKIPPING', None),
+    ('INCLUDED', None),
+)
+
+RECAP_RULE = '=' * 79
+
+
+def _host(group: str) -> str:
+    return r'(?:\ \[(?P<{}>[\w.\-]+)\])?'.format(group)
+
+
+# Every per-chunk fact the extractors need, fused into one alternation.
+# Each alternative ends in an empty marker group so match.lastgroup names
+# it. Alternatives are grouped by a plain leading character (class) so the
+# regex engine rejects most of them from the first character without
+# entering the branch. Sub-captures that other alternatives also need (task
+# and play names, hosts and retries left after RETRYING) sit in lookaheads so
+# the text they cover is still scanned.
+_SCANNER = re.compile('|'.join([
+    r'(?<![A-Za-z])[A-Za-z]+ \d+ [A-Za-z]+ \d{4}\s+\d{2}:\d{2}:\d{2}(?P<TIMESTAMP>)',
+    r'\((?P<duration>\d+:\d{2}:\d{2}\.\d+)\)(?P<DURATION>)',
+    r'[Oo](?i:k:)' + _host('ok_host') + '(?P<OK>)',
+    r'[Cc](?i:hanged:)' + _host('changed_host') + '(?P<CHANGED>)',
+    r'[Ss](?i:kipping:)' + _host('skipping_host') + '(?P<SKIPPING>)',
+    r'[Ii](?i:ncluded:)(?P<INCLUDED>)',
+    r'[Ff](?:'
+    r'(?i:ailed:)' + _host('failed_host') + '(?P<FAILED_HOST>)'
+    r'|(?i:atal:)' + _host('fatal_host') + '(?P<FATAL_HOST>)'
+    r'|(?i:AILED - RETRYING)(?=(?:: \[(?P<retry_host>[\w.\-]+)\])?)'
+    r'(?=(?i::.*\((?P<retries_left>\d+) retries left\))?)(?P<RETRYING>)'
+    r'|(?i:AILED!)(?P<FAILED>))',
+    r'[Uu](?:'
+    r'(?i:nreachable:)' + _host('unreachable_result_host') + '(?P<UNREACHABLE_HOST>)'
+    r'|(?i:NREACHABLE!)' + _host('unreachable_host') + '(?P<UNREACHABLE>))',
+    r'T(?:ASK (?=\[(?P<task>.*?)\])(?P<TASK>)|ASKS RECAP(?P<TASKS_RECAP>))',
+    r'P(?:LAY RECAP \*(?P<PLAY_RECAP>)|LAY (?=\[(?P<play>.*?)\])(?P<PLAY>))',
+    r'\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2}:\d{2}(?P<ISO_TIMESTAMP>)|T\d{2}:\d{2}:\d{2}(?P<ISO_T_TIMESTAMP>))',
+    r'={79}(?P<RULE>)',
+]))
+
+# Marker group -> (status it counts, group holding the host it names)
+_RESULT_ACTIONS = {
+    'OK': ('OK', 'ok_host'),
+    'CHANGED': ('CHANGED', 'changed_host'),
+    'SKIPPING': ('SKIPPING', 'skipping_host'),
+    'INCLUDED': ('INCLUDED', None),
+    'FAILED_HOST': (None, 'failed_host'),
+    'UNREACHABLE_HOST': (None, 'unreachable_result_host'),
+    'FATAL_HOST': (None, 'fatal_host'),
+    'FAILED': ('FAILED', None),
+    'UNREACHABLE': ('UNREACHABLE', 'unreachable_host'),
+}
+
+_HOST_STAT_PATTERN = re.compile(
+    r'^([\w\.\-]+)\s*:\s*ok=(\d+)\s+changed=(\d+)\s+unreachable=(\d+)\s+failed=(\d+)\s+skipped=(\d+)\s+rescued=(\d+)\s+ignored=(\d+)',
+    re.MULTILINE,
+)
+_TASK_TIMING_PATTERN = re.compile(r'^([^-]+?)\s*-+\s*([\d\.]+)s', re.MULTILINE)
+
+
+class ChunkScan:
+    """Raw facts collected from one chunk by scan_chunk."""
+
+    __slots__ = (
+        'play_recap_offsets', 'has_tasks_recap', 'has_recap_rule',
+        'playbook_name', 'task_names', 'hosts', 'status_counts',
+        'retry_counts', 'timestamps', 'durations',
+    )
+
+    def __init__(self):
+        self.play_recap_offsets: List[int] = []
+        self.has_tasks_recap = False
+        self.has_recap_rule = False
+        self.playbook_name: Optional[str] = None
+        self.task_names: List[str] = []
+        self.hosts: List[str] = []
+        self.status_counts: Dict[str, int] = {}
+        self.retry_counts: List[int] = []
+        self.timestamps: List[str] = []
+        self.durations: List[str] = []
+
+
+def scan_chunk(text: str) -> ChunkScan:
+    """
+    Collect Ansible metadata facts from a chunk in a single regex pass.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        ChunkScan with markers, names, hosts, status counts and timings
+    """
+    scan = ChunkScan()
+    status_counts = scan.status_counts
+    hosts = scan.hosts
+    text_timestamps = scan.timestamps
+    iso_timestamps = []
+    iso_t_timestamps = []
+
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        action = _RESULT_ACTIONS.get(kind)
+        if action is not None:
+            status, host_group = action
+            if status:
+                status_counts[status] = status_counts.get(status, 0) + 1
+            if host_group:
+                host = match.group(host_group)
+                if host:
+                    hosts.append(host)
+        elif kind == 'TIMESTAMP':
+            text_timestamps.append(match.group())
+        elif kind == 'DURATION':
+            scan.durations.append(match.group('duration'))
+        elif kind == 'TASK':
+            scan.task_names.append(match.group('task'))
+        elif kind == 'RETRYING':
+            status_counts['RETRYING'] = status_counts.get('RETRYING', 0) + 1
+            host = match.group('retry_host')
+            if host:
+                hosts.append(host)
+            retries_left = match.group('retries_left')
+            if retries_left:
+                scan.retry_counts.append(int(retries_left))
+        elif kind == 'PLAY':
+            if scan.playbook_name is None:
+                scan.playbook_name = match.group('play')
+        elif kind == 'PLAY_RECAP':
+            scan.play_recap_offsets.append(match.start())
+        elif kind == 'ISO_TIMESTAMP':
+            iso_timestamps.append(match.group())
+        elif kind == 'ISO_T_TIMESTAMP':
+            iso_t_timestamps.append(match.group())
+        elif kind == 'TASKS_RECAP':
+            scan.has_tasks_recap = True
+        else:
+            scan.has_recap_rule = True
+
+    # Keep the per-format grouping the extractors have always reported
+    text_timestamps.extend(iso_timestamps)
+    text_timestamps.extend(iso_t_timestamps)
+    return scan
+
+
+def scan_status_offsets(text: str, statuses: Optional[Iterable[str]] = None) -> Dict[str, List[int]]:
+    """
+    Find where each status counted by scan_chunk occurs.
+
+    Args:
+        text: Chunk text
+        statuses: Statuses to report (default: all of STATUS_ORDER)
+
+    Returns:
+        {status: [offset, ...]} with offsets into text, for statuses that occur
+    """
+    wanted = frozenset(statuses) if statuses is not None else None
+    offsets: Dict[str, List[int]] = {}
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind == 'RETRYING':
+            status = kind
+        else:
+            action = _RESULT_ACTIONS.get(kind)
+            status = action[0] if action is not None else None
+        if status and (wanted is None or status in wanted):
+            offsets.setdefault(status, []).append(match.start())
+    return offsets
+
+
+def parse_host_stats(text: str) -> List[Tuple[str, Dict[str, int]]]:
+    """
+    Parse PLAY RECAP rows into (hostname, counters) pairs.
+
+    Args:
+        text: Chunk text containing a PLAY RECAP section
+
+    Returns:
+        List of (hostname, {'ok': ..., 'ignored': ...}) in document order
+    """
+    rows = []
+    for hostname, ok, changed, unreachable, failed, skipped, rescued, ignored in _HOST_STAT_PATTERN.findall(text):
+        rows.append((hostname, {
+            'ok': int(ok),
+            'changed': int(changed),
+            'unreachable': int(unreachable),
+            'failed': int(failed),
+            'skipped': int(skipped),
+            'rescued': int(rescued),
+            'ignored': int(ignored)
+        }))
+    return rows
+
+
+def parse_task_timings(text: str, explicit: bool) -> List[Dict[str, Any]]:
+    """
+    Parse TASKS RECAP timing rows, longest task first.
+
+    Args:
+        text: Chunk text containing a TASKS RECAP section
+        explicit: True when the chunk has a 'TASKS RECAP' header; otherwise
+                  only the part after the last '=' rule line is parsed
+
+    Returns:
+        List of {'task': name, 'duration_seconds': float} dictionaries
+    """
+    if not explicit:
+        text = text.split(RECAP_RULE)[-1]
+    task_timings = [
+        {'task': task_name.strip(), 'duration_seconds': float(duration)}
+        for task_name, duration in _TASK_TIMING_PATTERN.findall(text)
+    ]
+    task_timings.sort(key=lambda x: x['duration_seconds'], reverse=True)
+    return task_timings
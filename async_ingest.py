@@ -0,0 +1,193 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from batch_chunking import init_worker
+from chonkie_chunking import process_ansible_logs_with_chonkie
+
+# Payload accepted from the input queue: (job_id, log_text)
+LogPayload = Tuple[Any, str]
+
+
+class IngestResult(NamedTuple):
+    """Outcome of processing one log payload."""
+
+    job_id: Any
+    result: Optional[Dict[str, Any]]  # process_ansible_logs_with_chonkie output
+    error: Optional[str]              # Set instead of result if processing failed
+    elapsed: float                    # Seconds spent in the executor
+
+
+def _run_job(process: Callable[..., Dict[str, Any]], job_id: Any, log_text: str) -> IngestResult:
+    started = time.perf_counter()
+    try:
+        result = process(log_text)
+    except Exception as exc:  # Report per job; one bad log must not stop the service
+        return IngestResult(job_id, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - started)
+    return IngestResult(job_id, result, None, time.perf_counter() - started)
+
+
+class AsyncLogIngestor:
+    """
+    asyncio front end for process_ansible_logs_with_chonkie.
+
+    Chunking and extraction are CPU-bound, so they run in an executor and
+    the event loop only schedules work and hands back results. At most
+    max_in_flight jobs are submitted at once; submit() and ingest() wait for
+    a free slot beyond that, which pushes back on whoever fills the queue.
+    A job submitted by ingest() keeps its slot until its result has been
+    taken from the generator, so a slow consumer holds back reading too.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_workers: Optional[int] = None,
+                 use_processes: bool = False, executor: Optional[Executor] = None,
+                 **process_options):
+        """
+        Initialize the ingestor.
+
+        Args:
+            max_in_flight: Jobs allowed to be queued, running, or waiting
+                           to be taken from ingest()
+            max_workers: Executor size when the ingestor creates it
+            use_processes: Use a process pool (parallel CPU) instead of
+                           threads; cannot be combined with a cache or
+                           baselines, which are not shared across processes
+            executor: Existing executor to use; it is not shut down by close()
+            **process_options: Keyword arguments for
+                               process_ansible_logs_with_chonkie (e.g. cache,
+                               baselines, collapse_retries)
+        """
+        if isinstance(executor, ProcessPoolExecutor) or (executor is None and use_processes):
+            for option in ("cache", "baselines"):
+                if process_options.get(option) is not None:
+                    raise ValueError(f"{option} cannot be shared with worker processes; use threads")
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._owns_executor = executor is None
+        if executor is None:
+            if use_processes:
+                executor = ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker)
+            else:
+                executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ansible-ingest")
+        self._executor = executor
+        self._process = functools.partial(process_ansible_logs_with_chonkie, **process_options)
+        self.in_flight = 0
+
+    async def submit(self, job_id: Any, log_text: str) -> "asyncio.Future[IngestResult]":
+        """
+        Queue one log for processing, waiting while max_in_flight is reached.
+
+        Args:
+            job_id: Caller's identifier, returned with the result
+            log_text: Raw Ansible log content
+
+        Returns:
+            Future resolving to the IngestResult
+        """
+        future = await self._start(job_id, log_text)
+        future.add_done_callback(self._release)
+        return future
+
+    async def _start(self, job_id: Any, log_text: str) -> "asyncio.Future[IngestResult]":
+        """Take a slot and run one job; the caller must release the slot."""
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, _run_job, self._process, job_id, log_text)
+
+    def _release(self, _future: "asyncio.Future[IngestResult]" = None) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def process(self, job_id: Any, log_text: str) -> IngestResult:
+        """Process one log and wait for its result."""
+        return await (await self.submit(job_id, log_text))
+
+    async def ingest(self, source: Union["asyncio.Queue[Optional[LogPayload]]", AsyncIterator[LogPayload]]
+                     ) -> AsyncIterator[IngestResult]:
+        """
+        Process payloads from a queue or async iterator as they arrive.
+
+        A queue is read until it yields None. Results are yielded in
+        completion order, so a large log does not hold back small ones
+        behind it.
+
+        Args:
+            source: asyncio.Queue of (job_id, log_text) payloads ending with
+                    None, or an async iterator of payloads
+
+        Yields:
+            IngestResult for every payload
+        """
+        # Every job holds a slot until its result is taken below, so the
+        # queue never holds more than max_in_flight results
+        results: "asyncio.Queue[Union[IngestResult, BaseException, None]]" = asyncio.Queue()
+        held = set()
+        reading = True
+
+        def deliver(job_id: Any, future: "asyncio.Future[IngestResult]") -> None:
+            if future.cancelled():
+                results.put_nowait((future, IngestResult(job_id, None, "CancelledError: job was cancelled", 0.0)))
+            else:
+                results.put_nowait((future, future.exception() or future.result()))
+
+        async def read() -> None:
+            nonlocal reading
+            try:
+                async for job_id, log_text in _payloads(source):
+                    future = await self._start(job_id, log_text)
+                    held.add(future)
+                    future.add_done_callback(functools.partial(deliver, job_id))
+            finally:
+                reading = False
+                results.put_nowait(None)  # Wake the consumer to re-check
+
+        reader = asyncio.ensure_future(read())
+        try:
+            while reading or held:
+                entry = await results.get()
+                if entry is None:
+                    continue
+                future, item = entry
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+                # Taken by the consumer: free the slot for the next payload
+                held.discard(future)
+                self._release()
+            await reader  # Surface errors from the source
+        finally:
+            reader.cancel()
+            # Abandoned jobs give their slots back once they finish
+            for future in held:
+                if future.done():
+                    self._release()
+                else:
+                    future.add_done_callback(self._release)
+
+    async def close(self) -> None:
+        """Wait for running jobs and shut down an executor created here."""
+        if self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def __aenter__(self) -> "AsyncLogIngestor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+async def _payloads(source) -> AsyncIterator[LogPayload]:
+    """Normalize a queue (None-terminated) or async iterator of payloads."""
+    if isinstance(source, asyncio.Queue):
+        while True:
+            payload = await source.get()
+            if payload is None:
+                return
+            yield payload
+    else:
+        async for payload in source:
+            yield payload
@@ -0,0 +1,180 @@
+import argparse
+import functools
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from chonkie_chunking import get_chonkie_splitters, process_ansible_logs_with_chonkie
+
+
+class JobResult(NamedTuple):
+    """Outcome of processing one job log in the pool."""
+
+    path: str
+    result: Optional[Dict[str, Any]]  # process_ansible_logs_with_chonkie output
+    error: Optional[str]              # Set instead of result if the job failed
+    elapsed: float                    # Seconds spent in the worker
+    summary: Optional[Dict[str, Any]] = None  # summarize_analyses output, with summary_only
+
+
+def init_worker() -> None:
+    """Warm the shared splitters once per worker process (pool initializer)."""
+    get_chonkie_splitters()
+
+
+def _process_job(path: str, summary_only: bool = False, include_metadata: bool = False) -> JobResult:
+    """
+    Chunk and extract one job log inside a worker.
+
+    With summary_only the result is reduced to summarize_analyses output
+    here, so only the counts (not every chunk) are pickled back to the
+    parent process.
+    """
+    started = time.perf_counter()
+    try:
+        with open(path, 'r', errors='replace') as file:
+            log_text = file.read()
+        result = process_ansible_logs_with_chonkie(log_text)
+        if summary_only:
+            summary = summarize_analyses(result, include_metadata)
+            return JobResult(path, None, None, time.perf_counter() - started, summary)
+    except Exception as exc:  # One bad log must not abort a whole backfill
+        return JobResult(path, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - started)
+    return JobResult(path, result, None, time.perf_counter() - started)
+
+
+def find_job_logs(paths: Iterable[str], pattern: str = "job_*.txt") -> List[str]:
+    """
+    Expand files and directories into a sorted list of job log paths.
+
+    Args:
+        paths: Log files and/or directories containing job logs
+        pattern: Glob used to select logs inside directories
+
+    Returns:
+        List of job log file paths
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(glob.glob(os.path.join(path, pattern)))
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def process_job_logs(paths: Iterable[str], workers: Optional[int] = None,
+                     chunksize: int = 1, summary_only: bool = False,
+                     include_metadata: bool = False) -> Iterator[JobResult]:
+    """
+    Chunk many job logs across a process pool.
+
+    Each worker builds its splitters once and reuses them for every job it
+    receives. Results are yielded in completion order, not input order.
+
+    Args:
+        paths: Job log file paths (see find_job_logs)
+        workers: Number of worker processes (defaults to the CPU count)
+        chunksize: Number of jobs handed to a worker at a time
+        summary_only: Summarize in the worker and return JobResult.summary
+                      instead of the full result, avoiding the cost of
+                      pickling every chunk back to this process
+        include_metadata: With summary_only, keep the metadata lists in
+                          the summary
+
+    Yields:
+        JobResult for every job
+    """
+    process = functools.partial(_process_job, summary_only=summary_only, include_metadata=include_metadata)
+    with multiprocessing.Pool(processes=workers, initializer=init_worker) as pool:
+        for job_result in pool.imap_unordered(process, paths, chunksize=chunksize):
+            yield job_result
+
+
+def summarize_analyses(result: Dict[str, Any], include_metadata: bool = False) -> Dict[str, Any]:
+    """
+    Per-analysis chunk, RECAP and error counts of one processed log.
+
+    Args:
+        result: process_ansible_logs_with_chonkie output
+        include_metadata: Include the full metadata lists per analysis
+
+    Returns:
+        Dictionary keyed by analysis type
+    """
+    summaries = {}
+    for analysis_type, data in result.items():
+        summary = {
+            'use_case': data['use_case'],
+            'chunks': len(data['chunks']),
+            'recap_chunks': sum(1 for m in data['metadata'] if m['chunk_type'] == 'RECAP'),
+            'error_chunks': sum(1 for m in data['metadata'] if m['has_error']),
+        }
+        if include_metadata:
+            summary['metadata'] = data['metadata']
+        summaries[analysis_type] = summary
+    return summaries
+
+
+def summarize_job(job_result: JobResult, include_metadata: bool = False) -> Dict[str, Any]:
+    """
+    Build a JSON-serializable record for one job result.
+
+    Args:
+        job_result: Result yielded by process_job_logs
+        include_metadata: Include the full metadata lists per analysis
+                          (summary_only results carry them only if
+                          process_job_logs was asked to keep them)
+
+    Returns:
+        Dictionary with per-analysis chunk, RECAP and error counts
+    """
+    record = {
+        'path': job_result.path,
+        'elapsed_seconds': round(job_result.elapsed, 6),
+        'error': job_result.error,
+    }
+    if job_result.summary is not None:
+        record.update(job_result.summary)
+    elif job_result.result is not None:
+        record.update(summarize_analyses(job_result.result, include_metadata))
+    return record
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Chunk directories of Ansible job logs across a process pool."
+    )
+    parser.add_argument('paths', nargs='+', help="Job log files or directories")
+    parser.add_argument('--pattern', default="job_*.txt", help="Glob for logs inside directories")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=1, help="Jobs handed to a worker at a time")
+    parser.add_argument('--output', default=None, help="Write JSON lines here instead of stdout")
+    parser.add_argument('--include-metadata', action='store_true', help="Include full chunk metadata")
+    args = parser.parse_args(argv)
+
+    paths = find_job_logs(args.paths, args.pattern)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    failures = 0
+    started = time.perf_counter()
+    try:
+        for job_result in process_job_logs(paths, workers=args.workers, chunksize=args.chunksize,
+                                           summary_only=True, include_metadata=args.include_metadata):
+            failures += job_result.error is not None
+            output.write(json.dumps(summarize_job(job_result, args.include_metadata)) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Processed {len(paths)} jobs ({failures} failed) in "
+          f"{time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
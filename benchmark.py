@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from batch_chunking import find_job_logs
+from chonkie_chunking import (
+    AnsibleChonkieLogSplitter,
+    extract_ansible_metadata_from_chonkie_chunks,
+    process_ansible_logs_with_chonkie,
+)
+from chunking_lang import (
+    AnsibleLogSplitter,
+    extract_ansible_metadata_from_chunks,
+    process_ansible_logs_for_monitoring,
+)
+from synthetic_logs import generate_ansible_log
+
+SPLITTER_TYPES = ("alert", "context", "error")
+
+
+class BenchmarkCase(NamedTuple):
+    """One thing to time over every input log."""
+
+    name: str
+    prepare: Callable[[str], Any]  # Untimed: log text -> input for run
+    run: Callable[[Any], int]      # Timed: returns the number of chunks produced
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+def default_cases() -> List[BenchmarkCase]:
+    """
+    Build the standard cases: every splitter type of both splitters, both
+    metadata extractors (on pre-split chunks) and both full pipelines.
+
+    Returns:
+        List of BenchmarkCase
+    """
+    cases = []
+    for splitter_type in SPLITTER_TYPES:
+        chonkie_splitter = AnsibleChonkieLogSplitter(splitter_type=splitter_type)
+        lang_splitter = AnsibleLogSplitter(splitter_type=splitter_type)
+        cases.append(BenchmarkCase(
+            f"chonkie.split.{splitter_type}", _identity,
+            lambda text, s=chonkie_splitter: len(s.chunk(text))
+        ))
+        cases.append(BenchmarkCase(
+            f"langchain.split.{splitter_type}", _identity,
+            lambda text, s=lang_splitter: len(s.split_text(text))
+        ))
+
+    chonkie_context = AnsibleChonkieLogSplitter(splitter_type="context")
+    lang_context = AnsibleLogSplitter(splitter_type="context")
+    cases.append(BenchmarkCase(
+        "chonkie.extract.context", chonkie_context.chunk,
+        lambda chunks: len(extract_ansible_metadata_from_chonkie_chunks(chunks))
+    ))
+    cases.append(BenchmarkCase(
+        "langchain.extract.context", lang_context.split_text,
+        lambda chunks: len(extract_ansible_metadata_from_chunks(chunks))
+    ))
+    cases.append(BenchmarkCase(
+        "chonkie.pipeline", _identity,
+        lambda text: sum(len(data['chunks']) for data in process_ansible_logs_with_chonkie(text).values())
+    ))
+    cases.append(BenchmarkCase(
+        "langchain.pipeline", _identity,
+        lambda text: sum(len(data['chunks']) for data in process_ansible_logs_for_monitoring(text).values())
+    ))
+    return cases
+
+
+def load_logs(paths: Sequence[str], pattern: str = "job_*.txt",
+              scales: Sequence[int] = (1,)) -> List[Tuple[str, str]]:
+    """
+    Read job logs, optionally scaled up by repetition.
+
+    A log at scale N is its text repeated N times, which keeps the marker
+    mix of real output while growing the size.
+
+    Args:
+        paths: Log files and/or directories (see find_job_logs)
+        pattern: Glob used to select logs inside directories
+        scales: Repetition factors; each log is included once per factor
+
+    Returns:
+        List of (name, text) pairs
+    """
+    logs = []
+    for path in find_job_logs(paths, pattern):
+        with open(path, 'r', errors='replace') as file:
+            text = file.read()
+        name = os.path.basename(path)
+        for scale in scales:
+            logs.append((name if scale == 1 else f"{name}x{scale}", text * scale))
+    return logs
+
+
+def synthetic_logs(sizes_mb: Sequence[float], seed: int = 0, hosts: int = 20) -> List[Tuple[str, str]]:
+    """
+    Generate one synthetic job log per requested size.
+
+    Args:
+        sizes_mb: Target sizes in megabytes
+        seed: Generator seed, so runs on different commits see the same input
+        hosts: Inventory size of the generated jobs
+
+    Returns:
+        List of (name, text) pairs
+    """
+    return [
+        (f"synthetic-{size:g}MB", generate_ansible_log(seed=seed, hosts=hosts, target_bytes=int(size * 1e6)))
+        for size in sizes_mb
+    ]
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_case(case: BenchmarkCase, logs: List[Tuple[str, str]], repeat: int = 3,
+             measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Time one case over every log.
+
+    Each log is run repeat times and its fastest run is kept as the per-job
+    latency. Peak memory is measured in a separate untimed pass because
+    tracemalloc slows allocation down considerably.
+
+    Args:
+        case: BenchmarkCase to run
+        logs: (name, text) pairs from load_logs
+        repeat: Runs per log
+        measure_memory: Also record the tracemalloc peak per job
+
+    Returns:
+        Dictionary of throughput, latency and memory figures
+    """
+    inputs = [case.prepare(text) for _, text in logs]
+    total_bytes = sum(len(text.encode('utf-8')) for _, text in logs)
+    latencies = []
+    chunks = 0
+    for item in inputs:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = case.run(item)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        latencies.append(best)
+        chunks += count
+
+    peak_memory = None
+    if measure_memory:
+        peak_memory = 0
+        for item in inputs:
+            tracemalloc.start()
+            case.run(item)
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    total_seconds = sum(latencies)
+    latencies.sort()
+    return {
+        'case': case.name,
+        'jobs': len(logs),
+        'bytes': total_bytes,
+        'chunks': chunks,
+        'seconds': round(total_seconds, 6),
+        'mb_per_second': round(total_bytes / 1e6 / total_seconds, 3) if total_seconds else None,
+        'chunks_per_second': round(chunks / total_seconds, 1) if total_seconds else None,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(logs: List[Tuple[str, str]], cases: Optional[List[BenchmarkCase]] = None,
+                   repeat: int = 3, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Run every case and collect the results with environment details.
+
+    Args:
+        logs: (name, text) pairs from load_logs
+        cases: Cases to run (defaults to default_cases())
+        repeat: Runs per log
+        measure_memory: Record peak memory per case
+
+    Returns:
+        JSON-serializable results document
+    """
+    if cases is None:
+        cases = default_cases()
+    return {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'inputs': [name for name, _ in logs],
+        'repeat': repeat,
+        'results': [run_case(case, logs, repeat, measure_memory) for case in cases],
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare throughput of two results documents case by case.
+
+    Args:
+        current: Results from run_benchmarks
+        baseline: Earlier results, e.g. loaded from a previous --output file
+
+    Returns:
+        List of {'case', 'baseline_mb_per_second', 'mb_per_second', 'ratio'}
+    """
+    previous = {result['case']: result for result in baseline['results']}
+    rows = []
+    for result in current['results']:
+        before = previous.get(result['case'])
+        if not before or not before['mb_per_second'] or not result['mb_per_second']:
+            continue
+        rows.append({
+            'case': result['case'],
+            'baseline_mb_per_second': before['mb_per_second'],
+            'mb_per_second': result['mb_per_second'],
+            'ratio': round(result['mb_per_second'] / before['mb_per_second'], 3),
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Ansible log splitters and metadata extractors."
+    )
+    parser.add_argument('paths', nargs='*', default=['log_files'], help="Job log files or directories")
+    parser.add_argument('--pattern', default="job_*.txt", help="Glob for logs inside directories")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help="Repetition factors for each log")
+    parser.add_argument('--synthetic-mb', type=float, nargs='+', default=[],
+                        help="Also benchmark generated logs of these sizes")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for generated logs")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per log; the fastest is kept")
+    parser.add_argument('--case', action='append', default=None, help="Only run cases starting with this prefix")
+    parser.add_argument('--no-memory', action='store_true', help="Skip the peak memory pass")
+    parser.add_argument('--output', default=None, help="Write the JSON results here")
+    parser.add_argument('--compare', default=None, help="Baseline JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    logs = load_logs(args.paths, args.pattern, args.scale) + synthetic_logs(args.synthetic_mb, args.seed)
+    if not logs:
+        parser.error("no job logs found")
+    cases = default_cases()
+    if args.case:
+        cases = [case for case in cases if any(case.name.startswith(prefix) for prefix in args.case)]
+
+    results = run_benchmarks(logs, cases, args.repeat, not args.no_memory)
+
+    print(f"{'case':<28}{'MB/s':>9}{'chunks/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'peak KiB':>10}")
+    for result in results['results']:
+        peak = result['peak_memory_bytes']
+        peak = f"{peak / 1024:.0f}" if peak is not None else "-"
+        print(f"{result['case']:<28}{result['mb_per_second'] or 0:>9.2f}{result['chunks_per_second'] or 0:>11.0f}"
+              f"{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+              f"{peak:>10}")
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            baseline = json.load(file)
+        for row in compare_results(results, baseline):
+            print(f"{row['case']:<28}{row['baseline_mb_per_second']:>9.2f} -> "
+                  f"{row['mb_per_second']:.2f} MB/s ({row['ratio']:.2f}x)")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
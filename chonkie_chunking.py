@@ -1,6 +1,190 @@
-from chonkie import RecursiveChunker, RecursiveRules, RecursiveLevel
+from chonkie import RecursiveChunker, RecursiveRules, RecursiveLevel, RecursiveChunk
+from bisect import bisect_left, bisect_right
+import codecs
+import hashlib
 import re
-from typing import List, Dict, Any, Sequence
+from typing import List, Dict, Any, Sequence, Tuple
+
+import ansible_lexer
+import ansible_scanner
+from mapped_log import MappedLog, OffsetChunk
+from columnar_metadata import to_columnar
+from retry_collapse import CollapsedLog, collapse_retry_storms
+from line_index import LineIndex
+from chunk_cache import ChunkCache, cache_key, content_digest
+from task_baselines import TaskBaselineStore
+from splitter_registry import default_registry, WARMUP_LOG
+from ansible_scanner import STATUS_ORDER, scan_chunk, parse_host_stats, parse_task_timings
+from ansible_lexer import (
+    LogSpan, lex_ansible_log,
+    PLAY, TASK, HANDLER, TIMING, HOST_STATS,
+    FATAL, UNREACHABLE, RETRY, ERROR, PLAY_RECAP, TASKS_RECAP,
+)
+
+# Bump when chunking or metadata semantics change without a pattern change.
+# RULES_VERSION also fingerprints the lexer and scanner patterns; each
+# splitter adds its SPAN_LEVELS and RecursiveRules on top (see cache_key),
+# so cached results (see ChunkCache) are ignored once any of them changes.
+RULES_REVISION = 2
+RULES_VERSION = hashlib.blake2b(
+    "\0".join([str(RULES_REVISION), ansible_lexer._MARKER_BODY, ansible_scanner._SCANNER.pattern]).encode(),
+    digest_size=8,
+).hexdigest()
+
+
+# Hostname at the start of a per-host result line: "ok: [web1]",
+# "fatal: [web1]: FAILED!", "FAILED - RETRYING: [web1]: ..."
+_RESULT_HOST = re.compile(r"(?:[a-z]+|FAILED - RETRYING): \[([^\]\n]+)\]")
+
+# Span kinds that end a TASK/HANDLER block for host sharding
+_TASK_BLOCK_END = frozenset([PLAY, TASK, HANDLER, PLAY_RECAP, TASKS_RECAP, HOST_STATS])
+
+
+class SpanCut:
+    """
+    One split point rule of a structural chunking level.
+    
+    Without delimiters the split point is the start of every lexer span of
+    kind. With delimiters it is every occurrence of one of them on the
+    span's marker line: before it for include_delim "next", after it for
+    "prev", as in Chonkie's RecursiveLevel.
+    """
+    
+    __slots__ = ("kind", "delimiters", "include_delim", "_pattern", "_pattern_bytes")
+    
+    def __init__(self, kind: str, delimiters: Tuple[str, ...] = (), include_delim: str = "next"):
+        self.kind = kind
+        self.delimiters = delimiters
+        self.include_delim = include_delim
+        alternation = "|".join(re.escape(delimiter) for delimiter in delimiters)
+        self._pattern = re.compile(alternation) if delimiters else None
+        self._pattern_bytes = re.compile(alternation.encode()) if delimiters else None
+    
+    def cuts(self, source, span: LogSpan) -> List[int]:
+        """Split points this rule puts in span (source is a str or MappedLog)."""
+        if self._pattern is None:
+            return [span.start]
+        if isinstance(source, str):
+            buffer, pattern, newline = source, self._pattern, "\n"
+        else:
+            buffer, pattern, newline = source.buffer, self._pattern_bytes, b"\n"
+        line_end = buffer.find(newline, span.start, span.end)
+        if line_end < 0:
+            line_end = span.end
+        if self.include_delim == "prev":
+            return [match.end() for match in pattern.finditer(buffer, span.start, line_end)]
+        return [match.start() for match in pattern.finditer(buffer, span.start, line_end)]
+    
+    def __repr__(self) -> str:
+        return f"SpanCut({self.kind!r}, {self.delimiters!r}, {self.include_delim!r})"
+
+
+class HostChunk:
+    """
+    Per-host slice of one TASK block, produced in host-sharded mode.
+    
+    The text is the task header (TASK line and timing line) followed by
+    only this host's result lines, which are not contiguous in the log.
+    segments holds the original (start, end) offsets of every piece, header
+    first; start_index/end_index span from the header to the host's last
+    line. Has the attributes of Chonkie's RecursiveChunk, so the metadata
+    extractors accept it unchanged.
+    """
+    
+    __slots__ = ("text", "host", "segments", "start_index", "end_index", "token_count", "level")
+    
+    def __init__(self, text: str, host: str, segments: List[Tuple[int, int]], level: int):
+        self.text = text
+        self.host = host
+        self.segments = segments
+        self.start_index = segments[0][0]
+        self.end_index = segments[-1][1]
+        self.token_count = len(text)
+        self.level = level
+    
+    def shifted(self, offset: int) -> "HostChunk":
+        """Copy with every offset moved by offset (used by the stream)."""
+        return HostChunk(
+            self.text, self.host,
+            [(start + offset, end + offset) for start, end in self.segments],
+            self.level,
+        )
+    
+    def __len__(self) -> int:
+        return self.token_count
+    
+    def __repr__(self) -> str:
+        return (
+            f"HostChunk(host={self.host!r}, start_index={self.start_index}, "
+            f"end_index={self.end_index}, segments={len(self.segments)})"
+        )
+
+
+def _rebase_chunks(chunks, offset: int) -> list:
+    """Copies of chunks with their offsets moved by offset."""
+    return [
+        chunk.shifted(offset) if isinstance(chunk, HostChunk) else RecursiveChunk(
+            text=chunk.text,
+            start_index=offset + chunk.start_index,
+            end_index=offset + chunk.end_index,
+            token_count=chunk.token_count,
+            level=chunk.level,
+        )
+        for chunk in chunks
+    ]
+
+
+class IncrementalChunkState:
+    """
+    Chunks of a log that is still growing, as returned by chunk_append().
+    
+    stable chunks end at or before stable_offset, the start of the last
+    block (PLAY, TASK, HANDLER or RECAP) that may still receive output; they
+    never change on later appends. provisional chunks cover the open tail,
+    whose text is kept so only it and new output get chunked next time.
+    chunk_append never modifies the state it is given, so an earlier state
+    can be appended to again (e.g. to retry after a bad read).
+    """
+    
+    __slots__ = ("stable", "stable_offset", "tail", "provisional")
+    
+    def __init__(self, stable: list, stable_offset: int, tail: str, provisional: list):
+        self.stable = stable
+        self.stable_offset = stable_offset
+        self.tail = tail
+        self.provisional = provisional
+    
+    @property
+    def chunks(self) -> list:
+        """All chunks of the log so far, stable first."""
+        return self.stable + self.provisional
+    
+    @property
+    def end_offset(self) -> int:
+        return self.stable_offset + len(self.tail)
+    
+    @classmethod
+    def from_chunks(cls, text: str, chunks: Sequence) -> "IncrementalChunkState":
+        """
+        Resume from a chunk list produced by chunk() over text.
+        
+        Chunks before the last chunk that starts on a block header are kept;
+        everything from that header on becomes the open tail.
+        
+        Args:
+            text: Log text the chunks were produced from
+            chunks: Chunks in document order
+            
+        Returns:
+            IncrementalChunkState to pass to chunk_append
+        """
+        for i in range(len(chunks) - 1, 0, -1):
+            start = chunks[i].start_index
+            header = lex_ansible_log(text[start:text.find("\n", start) + 1 or len(text)])
+            if header and header[0].kind in AnsibleChonkieLogStream.BOUNDARY_KINDS:
+                return cls(list(chunks[:i]), start, text[start:], [])
+        return cls([], 0, text, [])
+
 
 class AnsibleChonkieLogSplitter:
     """
@@ -8,15 +192,47 @@ class AnsibleChonkieLogSplitter:
     for Ansible-specific log boundaries and semantic preservation.
     """
     
-    def __init__(self, splitter_type: str = "context", **kwargs):
+    # Split points of the structural levels of each splitter type, one tuple
+    # of SpanCut rules per leading delimiter level of _create_ansible_rules;
+    # the remaining text-only levels are applied by Chonkie to regions that
+    # are still larger than chunk_size. Cuts land where the delimiters do:
+    # before a marker line ("next") or inside it, e.g. after ": ok=" of a
+    # PLAY RECAP row ("prev"). Delimiter text that only occurs inside task
+    # output (a quoted "TASK [" in a msg) is not a split point.
+    SPAN_LEVELS = {
+        "alert": [
+            (SpanCut(PLAY_RECAP),),
+            (SpanCut(FATAL), SpanCut(FATAL, ("UNREACHABLE!",)), SpanCut(UNREACHABLE), SpanCut(RETRY)),
+            (SpanCut(TASK),),
+        ],
+        "error": [
+            (SpanCut(PLAY_RECAP),),
+            (SpanCut(FATAL), SpanCut(FATAL, ("UNREACHABLE!",)), SpanCut(UNREACHABLE), SpanCut(RETRY),
+             SpanCut(ERROR)),
+            (SpanCut(TASK),),
+        ],
+        "context": [
+            (SpanCut(PLAY_RECAP),),
+            (SpanCut(PLAY),),
+            (SpanCut(TASK), SpanCut(HANDLER)),
+            (SpanCut(HOST_STATS, (": ok=", ": changed=", ": failed="), "prev"),),
+            (SpanCut(FATAL), SpanCut(FATAL, ("UNREACHABLE!",)), SpanCut(UNREACHABLE), SpanCut(RETRY)),
+            (SpanCut(TIMING, (" +0000 (", " GMT ("), "prev"),),
+        ],
+    }
+    
+    def __init__(self, splitter_type: str = "context", shard_by_host: bool = False, **kwargs):
         """
         Initialize the Ansible log splitter using Chonkie.
         
         Args:
             splitter_type: Type of splitter ('alert', 'context', 'error')
+            shard_by_host: Regroup the results of TASK blocks that report
+                           on more than one host into per-host HostChunks
             **kwargs: Additional arguments passed to RecursiveChunker
         """
         self.splitter_type = splitter_type
+        self.shard_by_host = shard_by_host
         
         # Create Ansible-specific recursive rules
         ansible_rules = self._create_ansible_rules(splitter_type)
@@ -38,6 +254,38 @@ class AnsibleChonkieLogSplitter:
             tokenizer_or_token_counter="character",  # Use character counting for simplicity
             **kwargs
         )
+        
+        # Structural levels are resolved from lexer spans; only the text-only
+        # fallback levels are left for Chonkie to apply on oversized spans
+        self.span_levels = self.SPAN_LEVELS.get(splitter_type, self.SPAN_LEVELS["context"])
+        self._cut_rules: Dict[str, List[Tuple[int, SpanCut]]] = {}
+        for level, rules in enumerate(self.span_levels):
+            for rule in rules:
+                self._cut_rules.setdefault(rule.kind, []).append((level, rule))
+        self.fallback_chunker = RecursiveChunker(
+            rules=RecursiveRules(levels=ansible_rules.levels[len(self.span_levels):]),
+            tokenizer_or_token_counter="character",
+            **kwargs
+        )
+        self.chunk_size = self.chunker.chunk_size
+        self.min_characters_per_chunk = self.chunker.min_characters_per_chunk
+        self._rules_version = hashlib.blake2b(
+            "\0".join([RULES_VERSION, repr(self.span_levels), repr(ansible_rules)]).encode(),
+            digest_size=8,
+        ).hexdigest()
+    
+    def cache_key(self, digest: bytes) -> str:
+        """
+        ChunkCache key for this splitter's configuration over one log.
+        
+        Args:
+            digest: chunk_cache.content_digest of the log
+            
+        Returns:
+            Cache key
+        """
+        splitter_type = self.splitter_type + (":hosts" if self.shard_by_host else "")
+        return cache_key(digest, splitter_type, self.chunk_size, self.min_characters_per_chunk, self._rules_version)
     
     def _create_ansible_rules(self, splitter_type: str) -> RecursiveRules:
         """Create Ansible-specific RecursiveRules based on splitter type."""
@@ -144,7 +392,7 @@ class AnsibleChonkieLogSplitter:
     
     def chunk(self, text: str) -> Sequence:
         """
-        Split Ansible log text into chunks using Chonkie's RecursiveChunker.
+        Split Ansible log text into chunks with Ansible-aware boundaries.
         
         Args:
             text: Raw Ansible log content
@@ -152,10 +400,284 @@ class AnsibleChonkieLogSplitter:
         Returns:
             Sequence of RecursiveChunk objects with Ansible-aware boundaries
         """
-        # Use Chonkie's chunker to split the text
-        chunks = self.chunker.chunk(text)
+        return self.chunk_spans(text, lex_ansible_log(text))
+    
+    def chunk_spans(self, text: str, spans: List[LogSpan]) -> List[RecursiveChunk]:
+        """
+        Turn a precomputed lexer span list into chunks.
+        
+        Lets several splitters share one lex_ansible_log pass over the same
+        log instead of each rescanning the text for its delimiters.
+        
+        Args:
+            text: Raw Ansible log content the spans were produced from
+            spans: Output of lex_ansible_log(text)
+            
+        Returns:
+            List of RecursiveChunk objects with Ansible-aware boundaries
+            (and HostChunk objects in host-sharded mode)
+        """
+        if self.shard_by_host:
+            return self._chunk_host_sharded(text, spans)
+        return self._regions_to_chunks(text, self._chunk_regions(text, spans))
+    
+    @staticmethod
+    def _regions_to_chunks(text: str, regions: List[Tuple[int, int, int]]) -> List[RecursiveChunk]:
+        return [
+            RecursiveChunk(
+                text=text[start:end],
+                start_index=start,
+                end_index=end,
+                token_count=end - start,
+                level=level,
+            )
+            for start, end, level in regions
+        ]
+    
+    def _chunk_host_sharded(self, text: str, spans: List[LogSpan]) -> list:
+        """
+        Chunk with every multi-host TASK block split into per-host chunks.
+        
+        Everything between such blocks (PLAY headers, single-host tasks,
+        recaps) is chunked as usual.
+        """
+        chunks: list = []
+        cuts = self._level_cuts(text, spans)
+        run_start = 0
+        i = 0
+        while i < len(spans):
+            if spans[i].kind not in (TASK, HANDLER):
+                i += 1
+                continue
+            j = i + 1
+            while j < len(spans) and spans[j].kind not in _TASK_BLOCK_END:
+                j += 1
+            shards = self._host_shards(text, spans, cuts, i, j)
+            if shards:
+                if run_start < i:
+                    regions: List[Tuple[int, int, int]] = []
+                    self._chunk_range(text, cuts, spans[run_start].start, spans[i - 1].end, 0, regions)
+                    chunks.extend(self._regions_to_chunks(text, regions))
+                chunks.extend(shards)
+                run_start = j
+            i = j
+        if run_start < len(spans):
+            regions = []
+            self._chunk_range(text, cuts, spans[run_start].start, spans[-1].end, 0, regions)
+            chunks.extend(self._regions_to_chunks(text, regions))
         return chunks
     
+    def _host_shards(self, text: str, spans: List[LogSpan], cuts: List[List[int]],
+                     lo: int, hi: int) -> List[HostChunk]:
+        """Per-host chunks for the TASK block spans[lo:hi], or [] for one host."""
+        header_end = lo + 1
+        while header_end < hi and spans[header_end].kind == TIMING:
+            header_end += 1
+        
+        # Result spans by host in order of first appearance; spans that name
+        # no host (included: ..., ERROR!) form a shard of their own
+        by_host: Dict[Any, List[Tuple[int, int]]] = {}
+        for span in spans[header_end:hi]:
+            match = _RESULT_HOST.match(text, span.start)
+            by_host.setdefault(match.group(1) if match else None, []).append((span.start, span.end))
+        if sum(host is not None for host in by_host) < 2:
+            return []
+        
+        header = (spans[lo].start, spans[header_end - 1].end)
+        header_text = text[header[0]:header[1]]
+        # Room left for result lines once the header is repeated; a header
+        # that leaves almost none is not worth sharding
+        budget = self.chunk_size - len(header_text)
+        if budget < self.min_characters_per_chunk:
+            return []
+        level = next((n for n, rules in enumerate(self.span_levels)
+                      if any(rule.kind == TASK for rule in rules)), 0)
+        shards = []
+        for host, segments in by_host.items():
+            # Pack this host's lines below chunk_size, repeating the header
+            group: List[Tuple[int, int]] = []
+            size = 0
+            for segment in segments:
+                length = segment[1] - segment[0]
+                if length > budget:
+                    # A result too large on its own is split further, as the
+                    # unsharded chunking would, but within the budget
+                    if group:
+                        shards.append(self._host_chunk(text, host, header, header_text, group, level))
+                        group, size = [], 0
+                    regions: List[Tuple[int, int, int]] = []
+                    self._chunk_range(text, cuts, segment[0], segment[1], level + 1, regions, budget)
+                    for start, end, piece_level in regions:
+                        shards.append(self._host_chunk(text, host, header, header_text, [(start, end)], piece_level))
+                    continue
+                if group and size + length > budget:
+                    shards.append(self._host_chunk(text, host, header, header_text, group, level))
+                    group, size = [], 0
+                group.append(segment)
+                size += length
+            if group:
+                shards.append(self._host_chunk(text, host, header, header_text, group, level))
+        shards.sort(key=lambda shard: shard.segments[1][0])
+        return shards
+    
+    @staticmethod
+    def _host_chunk(text: str, host: Any, header: Tuple[int, int], header_text: str,
+                    segments: List[Tuple[int, int]], level: int) -> HostChunk:
+        body = "".join(text[start:end] for start, end in segments)
+        return HostChunk(header_text + body, host, [header] + segments, level)
+    
+    def chunk_mapped(self, log: MappedLog, spans: List[LogSpan] = None) -> List[OffsetChunk]:
+        """
+        Chunk a memory-mapped log into offset-only chunks.
+        
+        No chunk text is materialized; OffsetChunk.text decodes from the
+        mapping on demand. Sizes and offsets are measured in bytes, which
+        equals characters for the ASCII output Ansible normally produces.
+        shard_by_host does not apply here: host shards are not contiguous
+        and would need their text materialized.
+        
+        Args:
+            log: MappedLog to chunk
+            spans: Output of lex_ansible_log(log.buffer), lexed here if omitted
+            
+        Returns:
+            List of OffsetChunk objects with Ansible-aware boundaries
+        """
+        if spans is None:
+            spans = lex_ansible_log(log.buffer)
+        return [
+            OffsetChunk(log, start, end, level)
+            for start, end, level in self._chunk_regions(log, spans)
+        ]
+    
+    def _chunk_regions(self, source, spans: List[LogSpan]) -> List[Tuple[int, int, int]]:
+        """Resolve spans into (start, end, level) chunk regions."""
+        regions: List[Tuple[int, int, int]] = []
+        if spans:
+            self._chunk_range(source, self._level_cuts(source, spans), spans[0].start, spans[-1].end, 0, regions)
+        return regions
+    
+    def _level_cuts(self, source, spans: List[LogSpan]) -> List[List[int]]:
+        """Sorted split points of every structural level, from one pass over the spans."""
+        cuts: List[List[int]] = [[] for _ in self.span_levels]
+        rules = self._cut_rules
+        for span in spans:
+            for level, rule in rules.get(span.kind, ()):
+                cuts[level].extend(rule.cuts(source, span))
+        return [sorted(set(level_cuts)) for level_cuts in cuts]
+    
+    def _chunk_range(self, source, cuts: List[List[int]], start: int, end: int,
+                     level: int, regions: List[Tuple[int, int, int]], chunk_size: int = None) -> None:
+        """
+        Recursively split source[start:end] the way RecursiveChunker splits text.
+        
+        chunk_size overrides the splitter's own (host shards pass what is
+        left after the repeated task header).
+        """
+        if chunk_size is None:
+            chunk_size = self.chunk_size
+        if level >= len(self.span_levels):
+            self._chunk_fallback(source, start, end, level, regions, chunk_size)
+            return
+        
+        # Split at every split point of this level inside the range
+        level_cuts = cuts[level]
+        bounds = [start]
+        bounds.extend(level_cuts[bisect_right(level_cuts, start):bisect_left(level_cuts, end)])
+        bounds.append(end)
+        
+        # Merge pieces shorter than min_characters_per_chunk into the next one
+        offsets = []
+        pending = None
+        for a, b in zip(bounds, bounds[1:]):
+            if pending is None:
+                pending = a
+            if b - pending >= self.min_characters_per_chunk:
+                offsets.append(pending)
+                pending = None
+        if pending is not None:
+            offsets.append(pending)
+        offsets.append(end)
+        
+        # Greedily pack consecutive pieces below chunk_size, recursing on
+        # anything that is still too large on its own
+        count = len(offsets) - 1
+        i = 0
+        while i < count:
+            j = min(bisect_left(offsets, offsets[i] + chunk_size, lo=i) - 1, count)
+            if j <= i:
+                j = i + 1
+            piece_start, piece_end = offsets[i], offsets[j]
+            if piece_end - piece_start > chunk_size:
+                self._chunk_range(source, cuts, piece_start, piece_end, level + 1, regions, chunk_size)
+            else:
+                regions.append((piece_start, piece_end, level))
+            i = j
+    
+    def _chunk_fallback(self, source, start: int, end: int, level: int,
+                        regions: List[Tuple[int, int, int]], chunk_size: int = None) -> None:
+        """Split an oversized region with the text-only fallback levels."""
+        fallback_chunker = self.fallback_chunker
+        if chunk_size is not None and chunk_size != self.chunk_size:
+            fallback_chunker = RecursiveChunker(
+                rules=fallback_chunker.rules,
+                tokenizer_or_token_counter="character",
+                chunk_size=chunk_size,
+                min_characters_per_chunk=self.min_characters_per_chunk,
+            )
+        if isinstance(source, str):
+            for sub in fallback_chunker.chunk(source[start:end]):
+                regions.append((start + sub.start_index, start + sub.end_index, level + sub.level))
+            return
+        
+        # Mapped logs are addressed in bytes: decode just this region and
+        # walk the byte length of each sub-chunk to map it back.
+        # surrogateescape keeps undecodable bytes round-tripping exactly.
+        position = start
+        region = source.buffer[start:end].decode(source.encoding, "surrogateescape")
+        for sub in fallback_chunker.chunk(region):
+            size = len(sub.text.encode(source.encoding, "surrogateescape"))
+            regions.append((position, position + size, level + sub.level))
+            position += size
+    
+    def chunk_append(self, appended: str, state: IncrementalChunkState = None) -> IncrementalChunkState:
+        """
+        Chunk newly appended log output without re-chunking the whole log.
+        
+        Only the open tail of the previous state plus the appended text is
+        lexed and chunked. Everything before the last block header in it is
+        closed and its chunks become stable; the rest is chunked
+        provisionally. As in the streaming front end, the text closed by
+        each call is chunked on its own, so the cost per call is
+        proportional to the new output plus the still-open block.
+        
+        Args:
+            appended: Text appended since the previous call (the whole log
+                      on the first call)
+            state: State returned by the previous call, or
+                   IncrementalChunkState.from_chunks to resume from chunk()
+                   output; None to start a new log
+            
+        Returns:
+            New IncrementalChunkState; offsets are into the whole log
+        """
+        if state is None:
+            state = IncrementalChunkState([], 0, "", [])
+        text = state.tail + appended
+        
+        cut = 0
+        for span in lex_ansible_log(text):
+            if span.kind in AnsibleChonkieLogStream.BOUNDARY_KINDS and span.start:
+                cut = span.start
+        
+        stable = state.stable
+        if cut:
+            # A new list: states passed in stay valid
+            stable = stable + _rebase_chunks(self.chunk(text[:cut]), state.stable_offset)
+        tail = text[cut:]
+        provisional = _rebase_chunks(self.chunk(tail), state.stable_offset + cut) if tail else []
+        return IncrementalChunkState(stable, state.stable_offset + cut, tail, provisional)
+    
     def split_text(self, text: str) -> List[str]:
         """
         Split text and return just the text content (compatibility method).
@@ -168,27 +690,157 @@ class AnsibleChonkieLogSplitter:
         """
         chunks = self.chunk(text)
         return [chunk.text for chunk in chunks]
+    
+    def stream(self, encoding: str = "utf-8") -> "AnsibleChonkieLogStream":
+        """
+        Create a streaming front end for chunking live job output.
+        
+        Args:
+            encoding: Encoding of the bytes passed to feed()
+            
+        Returns:
+            AnsibleChonkieLogStream bound to this splitter
+        """
+        return AnsibleChonkieLogStream(self, encoding=encoding)
+
+
+class AnsibleChonkieLogStream:
+    """
+    Incremental chunker for Ansible output that is still being written.
+    
+    Bytes are fed as they arrive. Whenever a new PLAY, TASK, RUNNING HANDLER
+    or RECAP header line completes, everything before it is closed and is
+    chunked and emitted with metadata right away. Only the open tail (the
+    block under the latest header plus any incomplete line) is kept in memory.
+    Chunk offsets are character offsets into the whole stream.
+    """
+    
+    # Header kinds that close the block before them
+    BOUNDARY_KINDS = frozenset([PLAY, TASK, HANDLER, PLAY_RECAP, TASKS_RECAP])
+    
+    def __init__(self, splitter: AnsibleChonkieLogSplitter, encoding: str = "utf-8",
+                 errors: str = "replace"):
+        """
+        Initialize the stream.
+        
+        Args:
+            splitter: Splitter used to chunk each closed block
+            encoding: Encoding of the bytes passed to feed()
+            errors: Decoding error handler
+        """
+        self.splitter = splitter
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        self._tail: List[str] = []     # Complete lines of the open block
+        self._partial: List[str] = []  # Pieces of the trailing line without its newline yet
+        self._offset = 0               # Stream offset of the open block
+        self._chunk_index = 0
+    
+    def feed(self, data: bytes) -> List[Tuple[RecursiveChunk, Dict[str, Any]]]:
+        """
+        Add raw output and return chunks whose block has closed.
+        
+        Args:
+            data: Next piece of the job output
+            
+        Returns:
+            List of (chunk, metadata) pairs, possibly empty
+        """
+        text = self._decoder.decode(data)
+        newline = text.rfind("\n") + 1
+        if not newline:
+            # Joined once the line completes, so a long line costs O(n)
+            if text:
+                self._partial.append(text)
+            return []
+        self._partial.append(text[:newline])
+        lines = "".join(self._partial)
+        self._partial = [text[newline:]] if newline < len(text) else []
+        
+        # Only the newly completed lines need lexing; the last boundary
+        # header among them closes everything before it
+        cut = None
+        for span in lex_ansible_log(lines):
+            if span.kind in self.BOUNDARY_KINDS:
+                cut = span.start
+        if cut is None or (cut == 0 and not self._tail):
+            self._tail.append(lines)
+            return []
+        
+        self._tail.append(lines[:cut])
+        closed = "".join(self._tail)
+        self._tail = [lines[cut:]]
+        return self._emit(closed)
+    
+    def flush(self) -> List[Tuple[RecursiveChunk, Dict[str, Any]]]:
+        """
+        Close the stream and return chunks for the remaining open block.
+        
+        Returns:
+            List of (chunk, metadata) pairs, possibly empty
+        """
+        self._tail.extend(self._partial)
+        self._tail.append(self._decoder.decode(b"", final=True))
+        closed = "".join(self._tail)
+        self._tail = []
+        self._partial = []
+        return self._emit(closed)
+    
+    def _emit(self, closed: str) -> List[Tuple[RecursiveChunk, Dict[str, Any]]]:
+        """Chunk a closed block and rebase offsets onto the whole stream."""
+        chunks = _rebase_chunks(self.splitter.chunk(closed), self._offset)
+        metadata = extract_ansible_metadata_from_chonkie_chunks(chunks, first_index=self._chunk_index)
+        self._offset += len(closed)
+        self._chunk_index += len(chunks)
+        return list(zip(chunks, metadata))
 
 
-def extract_ansible_metadata_from_chonkie_chunks(chunks) -> List[Dict[str, Any]]:
+def _line_kinds(line_index: LineIndex, chunk) -> Dict[str, int]:
+    """Line kind counts of a chunk (every segment of a HostChunk)."""
+    segments = chunk.segments if isinstance(chunk, HostChunk) else ((chunk.start_index, chunk.end_index),)
+    counts: Dict[str, int] = {}
+    for start, end in segments:
+        for kind, count in line_index.kind_counts(start, end).items():
+            counts[kind] = counts.get(kind, 0) + count
+    return counts
+
+
+def extract_ansible_metadata_from_chonkie_chunks(chunks, first_index: int = 0,
+                                                 include_text: bool = True,
+                                                 counters: bool = False,
+                                                 line_index: LineIndex = None) -> List[Dict[str, Any]]:
     """
     Extract Ansible-specific metadata from Chonkie chunks.
     
     Args:
-        chunks: Sequence of RecursiveChunk objects from Chonkie
+        chunks: Sequence of RecursiveChunk (or OffsetChunk) objects
+        first_index: chunk_index assigned to the first chunk
+        include_text: Copy each chunk's text into 'chunk_text'; when False
+                      it is None and callers use chonkie_start/chonkie_end
+        counters: Replace the 'statuses' and 'error_types' lists with
+                  'status_counts' and 'error_type_counts' ({name: count});
+                  chunk_metadata.status_offsets gives the occurrences
+        line_index: LineIndex of the text the chunk offsets refer to; adds
+                    'line_kinds' ({line kind: lines starting in the chunk},
+                    e.g. {'TASK': 2, 'FATAL': 1, 'OTHER': 14}) from the
+                    index instead of another pass over the text
+        
+    HostChunk metadata also gets 'chunk_segments', the (start, end) log
+    offsets of the pieces its text joins; chonkie_start/chonkie_end then
+    only bound the chunk, and chunk_metadata.chunk_source_text rebuilds its
+    text from a log.
         
     Returns:
         List of metadata dictionaries with extracted information
     """
     metadata_chunks = []
     
-    for i, chunk in enumerate(chunks):
+    for i, chunk in enumerate(chunks, first_index):
         # Convert Chonkie chunk to our metadata format
         chunk_text = chunk.text
         
         metadata = {
             'chunk_index': i,
-            'chunk_text': chunk_text,
+            'chunk_text': chunk_text if include_text else None,
             'chunk_type': 'standard',
             'chonkie_level': chunk.level,  # Preserve Chonkie's level info
             'chonkie_start': chunk.start_index,
@@ -207,135 +859,78 @@ def extract_ansible_metadata_from_chonkie_chunks(chunks) -> List[Dict[str, Any]]
             'task_timings': []
         }
         
+        scan = scan_chunk(chunk_text)
+        
         # Check if this is a RECAP chunk
-        if re.search(r'PLAY RECAP \*+', chunk_text, re.MULTILINE):
+        if scan.play_recap_offsets:
             metadata['chunk_type'] = 'RECAP'
             metadata['statuses'] = ['SUMMARY']
             
             # Extract host statistics from PLAY RECAP
-            host_stat_pattern = r'^([\w\.\-]+)\s*:\s*ok=(\d+)\s+changed=(\d+)\s+unreachable=(\d+)\s+failed=(\d+)\s+skipped=(\d+)\s+rescued=(\d+)\s+ignored=(\d+)'
-            host_stats = re.findall(host_stat_pattern, chunk_text, re.MULTILINE)
-            
-            for host_stat in host_stats:
-                hostname, ok, changed, unreachable, failed, skipped, rescued, ignored = host_stat
-                metadata['host_stats'][hostname] = {
-                    'ok': int(ok),
-                    'changed': int(changed), 
-                    'unreachable': int(unreachable),
-                    'failed': int(failed),
-                    'skipped': int(skipped),
-                    'rescued': int(rescued),
-                    'ignored': int(ignored)
-                }
+            for hostname, stats in parse_host_stats(chunk_text):
+                metadata['host_stats'][hostname] = stats
                 
                 # Determine overall status from host stats
-                if int(failed) > 0 or int(unreachable) > 0:
+                if stats['failed'] > 0 or stats['unreachable'] > 0:
                     metadata['has_error'] = True
-                    if int(unreachable) > 0:
+                    if stats['unreachable'] > 0:
                         metadata['error_types'].append('HOST_UNREACHABLE_SUMMARY')
-                    if int(failed) > 0:
+                    if stats['failed'] > 0:
                         metadata['error_types'].append('TASK_FAILED_SUMMARY')
             
             # Extract all hosts mentioned in RECAP
             metadata['hosts'] = list(metadata['host_stats'].keys())
         
         # Extract task timings (both explicit and implicit TASKS RECAP)
-        has_task_timings = False
-        
-        if 'TASKS RECAP' in chunk_text:
-            has_task_timings = True
-            timing_pattern = r'^([^-]+?)\s*-+\s*([\d\.]+)s'
-            task_timings = re.findall(timing_pattern, chunk_text, re.MULTILINE)
+        if scan.has_tasks_recap or scan.has_recap_rule:
+            metadata['task_timings'] = parse_task_timings(chunk_text, explicit=scan.has_tasks_recap)
             metadata['chunk_type'] = 'RECAP'
             metadata['statuses'] = ['SUMMARY']
         
-        elif '===============================================================================' in chunk_text:
-            has_task_timings = True
-            parts = chunk_text.split('===============================================================================')
-            if len(parts) > 1:
-                tasks_section = parts[-1]
-                timing_pattern = r'^([^-]+?)\s*-+\s*([\d\.]+)s'
-                task_timings = re.findall(timing_pattern, tasks_section, re.MULTILINE)
-            else:
-                task_timings = []
-        
-        if has_task_timings:
-            for task_name, duration in task_timings:
-                metadata['task_timings'].append({
-                    'task': task_name.strip(),
-                    'duration_seconds': float(duration)
-                })
-            metadata['chunk_type'] = 'RECAP'
-            metadata['statuses'] = ['SUMMARY']
-            metadata['task_timings'].sort(key=lambda x: x['duration_seconds'], reverse=True)
-        
         # Standard chunk processing (only if not RECAP)
         if metadata['chunk_type'] != 'RECAP':
-            # Extract playbook/play name
-            playbook_match = re.search(r'PLAY \[(.*?)\]', chunk_text)
-            if playbook_match:
-                metadata['playbook_name'] = playbook_match.group(1)
-            
-            # Extract ALL task names
-            task_matches = re.findall(r'TASK \[(.*?)\]', chunk_text)
-            if task_matches:
-                metadata['task_names'] = task_matches
+            metadata['playbook_name'] = scan.playbook_name
+            if scan.task_names:
+                metadata['task_names'] = scan.task_names
         
         # Extract all host information
-        host_patterns = [
-            r'(?i)(?:ok|changed|failed|skipping|unreachable|fatal): \[([\w\.\-]+)\]',
-            r'(?i)FAILED - RETRYING: \[([\w\.\-]+)\]',
-            r'(?i)UNREACHABLE! \[([\w\.\-]+)\]'
-        ]
-        
-        host_matches = []
-        for pattern in host_patterns:
-            matches = re.findall(pattern, chunk_text)
-            host_matches.extend(matches)
-        
-        if host_matches:
-            metadata['hosts'] = list(set(host_matches))
+        if scan.hosts:
+            metadata['hosts'] = list(set(scan.hosts))
         
         # Extract ALL status and error information
-        status_patterns = [
-            (r'(?i)FAILED!', 'FAILED', 'TASK_FAILED'),
-            (r'(?i)UNREACHABLE!', 'UNREACHABLE', 'HOST_UNREACHABLE'),
-            (r'(?i)FAILED - RETRYING', 'RETRYING', 'RETRY_FAILURE'),
-            (r'(?i)changed:', 'CHANGED', None),
-            (r'(?i)ok:', 'OK', None),
-            (r'(?i)skipping:', 'SKIPPING', None),
-            (r'(?i)included:', 'INCLUDED', None)
-        ]
+        if counters:
+            # Only RECAP summaries so far; the statuses below are distinct names
+            statuses = metadata.pop('statuses')
+            error_types = metadata.pop('error_types')
+            metadata['status_counts'] = {name: statuses.count(name) for name in statuses}
+            metadata['error_type_counts'] = {name: error_types.count(name) for name in error_types}
+            for status_name, error_type in STATUS_ORDER:
+                count = scan.status_counts.get(status_name)
+                if count:
+                    metadata['status_counts'][status_name] = count
+                    if error_type:
+                        metadata['has_error'] = True
+                        metadata['error_type_counts'][error_type] = count
+        else:
+            for status_name, error_type in STATUS_ORDER:
+                count = scan.status_counts.get(status_name)
+                if count:
+                    metadata['statuses'].extend([status_name] * count)
+                    
+                    if error_type:
+                        metadata['has_error'] = True
+                        metadata['error_types'].extend([error_type] * count)
         
-        for pattern, status_name, error_type in status_patterns:
-            matches = re.findall(pattern, chunk_text)
-            if matches:
-                metadata['statuses'].extend([status_name] * len(matches))
-                
-                if error_type:
-                    metadata['has_error'] = True
-                    metadata['error_types'].extend([error_type] * len(matches))
-        
-        # Extract ALL retry counts
-        retry_matches = re.findall(r'(?i)FAILED - RETRYING:.*\((\d+) retries left\)', chunk_text)
-        if retry_matches:
-            metadata['retry_counts'] = [int(count) for count in retry_matches]
-        
-        # Extract ALL timestamps
-        timestamp_patterns = [
-            r'([A-Za-z]+ \d+ [A-Za-z]+ \d{4}\s+\d{2}:\d{2}:\d{2})',
-            r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})',
-            r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'
-        ]
-        
-        for pattern in timestamp_patterns:
-            timestamps = re.findall(pattern, chunk_text)
-            metadata['timestamps'].extend(timestamps)
-        
-        # Extract ALL durations
-        duration_matches = re.findall(r'\((\d+:\d{2}:\d{2}\.\d+)\)', chunk_text)
-        if duration_matches:
-            metadata['durations'] = duration_matches
+        # Extract ALL retry counts, timestamps and durations
+        if scan.retry_counts:
+            metadata['retry_counts'] = scan.retry_counts
+        metadata['timestamps'] = scan.timestamps
+        if scan.durations:
+            metadata['durations'] = scan.durations
+        if line_index is not None:
+            metadata['line_kinds'] = _line_kinds(line_index, chunk)
+        if isinstance(chunk, HostChunk):
+            metadata['chunk_segments'] = chunk.segments
         
         metadata_chunks.append(metadata)
     
@@ -370,38 +965,194 @@ def create_specialized_chonkie_splitters():
     return alert_splitter, context_splitter, error_splitter
 
 
-def process_ansible_logs_with_chonkie(log_text: str) -> Dict[str, Any]:
+def get_chonkie_splitters():
+    """
+    Return the process-wide (alert, context, error) Chonkie splitters.
+    
+    Built and warmed up on first use, then shared across calls and threads;
+    the warmup time is recorded in default_registry.warmup_seconds['chonkie'].
+    
+    Returns:
+        Tuple of (alert_splitter, context_splitter, error_splitter)
+    """
+    return default_registry.get('chonkie', _build_warm_chonkie_splitters)
+
+
+def _build_warm_chonkie_splitters():
+    splitters = create_specialized_chonkie_splitters()
+    process_ansible_logs_with_chonkie(WARMUP_LOG, splitters=splitters)
+    return splitters
+
+
+def _chunk_metadata(chunks, include_text: bool, columnar: bool, collapsed: CollapsedLog = None):
+    metadata = extract_ansible_metadata_from_chonkie_chunks(chunks, include_text=include_text)
+    return _finish_metadata(metadata, columnar, collapsed)
+
+
+def _finish_metadata(metadata: List[Dict[str, Any]], columnar: bool, collapsed: CollapsedLog = None):
+    if collapsed is not None:
+        for meta in metadata:
+            meta['original_start'], meta['original_end'] = collapsed.original_span(
+                meta['chonkie_start'], meta['chonkie_end']
+            )
+    return to_columnar(metadata) if columnar else metadata
+
+
+def _chunk_entries(chunks) -> list:
+    """Offsets-only form of a chunk list for the cache."""
+    return [
+        ('host', chunk.host, chunk.segments, chunk.level) if isinstance(chunk, HostChunk)
+        else (chunk.start_index, chunk.end_index, chunk.level)
+        for chunk in chunks
+    ]
+
+
+def _chunks_from_entries(text: str, entries: list) -> list:
+    """Rebuild chunks from _chunk_entries output and the log text."""
+    chunks = []
+    for entry in entries:
+        if len(entry) == 4:
+            _, host, segments, level = entry
+            chunks.append(HostChunk("".join(text[a:b] for a, b in segments), host, segments, level))
+        else:
+            start, end, level = entry
+            chunks.append(RecursiveChunk(
+                text=text[start:end], start_index=start, end_index=end,
+                token_count=end - start, level=level,
+            ))
+    return chunks
+
+
+def process_ansible_logs_with_chonkie(log_text: str, splitters=None, columnar: bool = False,
+                                      collapse_retries: bool = False,
+                                      line_index: LineIndex = None,
+                                      cache: ChunkCache = None,
+                                      baselines: TaskBaselineStore = None) -> Dict[str, Any]:
     """
     Process Ansible logs using Chonkie-based splitters with different strategies.
     
     Args:
         log_text: Raw Ansible log content
+        splitters: Optional (alert, context, error) splitters; defaults to
+                   the shared get_chonkie_splitters() instances
+        columnar: Return each 'metadata' as a ColumnarMetadata (NumPy
+                  arrays) instead of a list of dictionaries
+        collapse_retries: Collapse "FAILED - RETRYING" runs before chunking
+                          (see retry_collapse). Chunks and chonkie_start/end
+                          then refer to the collapsed text, and each metadata
+                          dict gains original_start/original_end
+        line_index: build_line_index(log_text) if the caller already built
+                    one; its spans are reused instead of lexing again, and
+                    every metadata dict gains 'line_kinds' from it
+        cache: Optional ChunkCache; chunk offsets and metadata for a log
+               seen before are served from it after one hash pass
+        baselines: Optional TaskBaselineStore (e.g. the one the alert
+                   rules use) to learn from this log's TASKS RECAP
+                   durations; they are added once, from the context
+                   analysis, so alerts evaluated afterwards count them too
         
     Returns:
         Dictionary with processed chunks for different use cases
     """
-    alert_splitter, context_splitter, error_splitter = create_specialized_chonkie_splitters()
+    if splitters is None:
+        splitters = get_chonkie_splitters()
     
-    # Split using different strategies
-    alert_chunks = alert_splitter.chunk(log_text)
-    context_chunks = context_splitter.chunk(log_text)
-    error_chunks = error_splitter.chunk(log_text)
+    collapsed = None
+    if collapse_retries:
+        if line_index is not None:
+            raise ValueError("line_index indexes the original text and cannot be used with collapse_retries")
+        collapsed = collapse_retry_storms(log_text)
+        log_text = collapsed.text
     
-    # Extract metadata from each chunk type
+    digest = content_digest(log_text) if cache is not None else None
+    spans = None
+    analyses = []
+    for splitter in splitters:
+        key = None
+        if cache is not None:
+            key = splitter.cache_key(digest)
+            cached = cache.get(key)
+            if cached is not None:
+                entries, metadata = cached
+                chunks = _chunks_from_entries(log_text, entries)
+                for meta, chunk in zip(metadata, chunks):
+                    meta['chunk_text'] = chunk.text
+                    if line_index is not None:
+                        meta['line_kinds'] = _line_kinds(line_index, chunk)
+                analyses.append((chunks, metadata))
+                continue
+        
+        # Lex once, then split the shared spans using different strategies
+        if spans is None:
+            spans = line_index.spans() if line_index is not None else lex_ansible_log(log_text)
+        chunks = splitter.chunk_spans(log_text, spans)
+        metadata = extract_ansible_metadata_from_chonkie_chunks(chunks, line_index=line_index)
+        if cache is not None:
+            stored = [dict(meta, chunk_text=None) for meta in metadata]
+            for meta in stored:
+                meta.pop('line_kinds', None)  # Depends on the caller passing an index, not on the log
+            cache.put(key, (_chunk_entries(chunks), stored))
+        analyses.append((chunks, metadata))
+    
+    (alert_chunks, alert_metadata), (context_chunks, context_metadata), (error_chunks, error_metadata) = analyses
+    if baselines is not None:
+        baselines.observe_metadata(context_metadata)
     return {
         'alert_analysis': {
             'chunks': alert_chunks,
-            'metadata': extract_ansible_metadata_from_chonkie_chunks(alert_chunks),
+            'metadata': _finish_metadata(alert_metadata, columnar, collapsed),
             'use_case': 'real_time_alerting'
         },
         'context_analysis': {
             'chunks': context_chunks, 
-            'metadata': extract_ansible_metadata_from_chonkie_chunks(context_chunks),
+            'metadata': _finish_metadata(context_metadata, columnar, collapsed),
+            'use_case': 'correlation_and_baseline_learning'
+        },
+        'error_analysis': {
+            'chunks': error_chunks,
+            'metadata': _finish_metadata(error_metadata, columnar, collapsed),
+            'use_case': 'failure_pattern_detection'
+        }
+    }
+
+
+def process_ansible_log_file(log: MappedLog, columnar: bool = False) -> Dict[str, Any]:
+    """
+    Process a memory-mapped Ansible log with offset-only chunks.
+    
+    Same result shape as process_ansible_logs_with_chonkie, but chunks are
+    OffsetChunk objects and metadata carries offsets instead of a copy of
+    the chunk text, so the log is held in memory once (as the mapping).
+    Keep the MappedLog open while the chunks are in use.
+    
+    Args:
+        log: MappedLog of the job log
+        columnar: Return each 'metadata' as a ColumnarMetadata
+        
+    Returns:
+        Dictionary with processed chunks for different use cases
+    """
+    alert_splitter, context_splitter, error_splitter = get_chonkie_splitters()
+    
+    spans = lex_ansible_log(log.buffer)
+    alert_chunks = alert_splitter.chunk_mapped(log, spans)
+    context_chunks = context_splitter.chunk_mapped(log, spans)
+    error_chunks = error_splitter.chunk_mapped(log, spans)
+    
+    return {
+        'alert_analysis': {
+            'chunks': alert_chunks,
+            'metadata': _chunk_metadata(alert_chunks, False, columnar),
+            'use_case': 'real_time_alerting'
+        },
+        'context_analysis': {
+            'chunks': context_chunks,
+            'metadata': _chunk_metadata(context_chunks, False, columnar),
             'use_case': 'correlation_and_baseline_learning'
         },
         'error_analysis': {
             'chunks': error_chunks,
-            'metadata': extract_ansible_metadata_from_chonkie_chunks(error_chunks),
+            'metadata': _chunk_metadata(error_chunks, False, columnar),
             'use_case': 'failure_pattern_detection'
         }
     }
@@ -442,10 +1193,29 @@ if __name__ == "__main__":
     # Test complete processing pipeline
     print(f"\n=== Complete Processing Pipeline ===")
     results = process_ansible_logs_with_chonkie(sample_log)
+    print(f"Splitter warmup: {default_registry.warmup_seconds['chonkie'] * 1000:.1f} ms (once per process)")
     
     for analysis_type, data in results.items():
         print(f"{analysis_type}: {len(data['chunks'])} chunks")
         recap_count = sum(1 for m in data['metadata'] if m['chunk_type'] == 'RECAP')
         error_count = sum(1 for m in data['metadata'] if m['has_error'])
         print(f"  - RECAP chunks: {recap_count}")
-        print(f"  - Error chunks: {error_count}")
\ No newline at end of file
+        print(f"  - Error chunks: {error_count}")
+    
+    # Stream the same log as if it were live job output
+    print(f"\n=== Streaming ===")
+    stream = AnsibleChonkieLogSplitter(splitter_type="alert").stream()
+    emitted = []
+    with open('log_files/job_1434764.txt', 'rb') as file:
+        for block in iter(lambda: file.read(4096), b""):
+            emitted.extend(stream.feed(block))
+    emitted.extend(stream.flush())
+    print(f"Streamed {len(emitted)} chunks")
+    print(f"  - Error chunks: {sum(1 for _, meta in emitted if meta['has_error'])}")
+    
+    # File-backed processing: chunks are byte offsets into a memory map
+    print(f"\n=== Memory-mapped Processing ===")
+    with MappedLog('log_files/job_1434764.txt') as log:
+        mapped_results = process_ansible_log_file(log)
+        for analysis_type, data in mapped_results.items():
+            print(f"{analysis_type}: {len(data['chunks'])} chunks")
\ No newline at end of file
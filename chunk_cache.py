@@ -0,0 +1,200 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Tuple, Union
+
+
+def content_digest(text: Union[str, bytes]) -> bytes:
+    """Hash of a log's content; the only full pass a cache hit costs."""
+    if isinstance(text, str):
+        text = text.encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(text, digest_size=20).digest()
+
+
+def cache_key(digest: bytes, splitter_type: str, chunk_size: int,
+              min_characters_per_chunk: int, rules_version: str) -> str:
+    """
+    Build the cache key for one splitter configuration over one log.
+
+    Args:
+        digest: content_digest of the log
+        splitter_type: Splitter type ('alert', 'context', 'error', ...)
+        chunk_size: Splitter chunk_size
+        min_characters_per_chunk: Splitter min_characters_per_chunk
+        rules_version: Fingerprint of the splitting and extraction rules
+
+    Returns:
+        Hex key
+    """
+    params = f"{splitter_type}\0{chunk_size}\0{min_characters_per_chunk}\0{rules_version}"
+    return hashlib.blake2b(digest + params.encode(), digest_size=20).hexdigest()
+
+
+class ChunkCache:
+    """
+    Memoizes chunking and metadata results by content hash.
+
+    Entries are pickled, so the memory tier is accounted in exact bytes and
+    callers never share mutable results with the cache. The memory tier is
+    an LRU bounded by max_bytes. If directory is set, entries are also
+    written there as one file per key; that tier is bounded by
+    max_disk_bytes, evicting the least recently used files (by mtime).
+
+    Disk entries are unpickled on read, and unpickling can run arbitrary
+    code, so directory must only be writable by users trusted to run code
+    as the reader. It is created private to the current user; do not point
+    it at a shared or world-writable location.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, directory: Optional[str] = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget for pickled entries
+            directory: Optional directory for the on-disk tier
+            max_disk_bytes: Disk budget for the on-disk tier
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        # Running size of the disk tier, so puts do not rescan the directory;
+        # resynced from a scan whenever it crosses the budget
+        self._disk_size = 0
+        self._disk_lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            self._disk_size = sum(size for _, size, _ in self._scan_disk())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Bytes held by the memory tier."""
+        return self._size
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look a key up in memory, then on disk.
+
+        Args:
+            key: Key from cache_key
+
+        Returns:
+            The stored value, or None on a miss
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return pickle.loads(data)
+
+        data = self._read_disk(key)
+        with self._lock:
+            if data is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._store(key, data)
+        return pickle.loads(data)
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value under a key in both tiers.
+
+        Args:
+            key: Key from cache_key
+            value: Picklable result
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, data)
+        self._write_disk(key, data)
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _store(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)  # Mark as recently used for disk eviction
+        except OSError:
+            return None
+        return data
+
+    def _write_disk(self, key: str, data: bytes) -> None:
+        if not self.directory or len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        with self._disk_lock:
+            try:
+                replaced = os.stat(path).st_size
+            except OSError:
+                replaced = 0
+            # Write then rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+            self._disk_size += len(data) - replaced
+            if self._disk_size > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk(self) -> Iterator[Tuple[float, int, str]]:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def _evict_disk(self) -> None:
+        # Rescan (other processes may share the directory) and evict down to
+        # 90% of the budget, so the scan is amortized over many puts
+        entries = sorted(self._scan_disk())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 9 // 10
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_size = total
+
@@ -0,0 +1,197 @@
+import zlib
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Deduplication is optional; chunking needs no NumPy
+    np = None
+
+from chunk_metadata import chunk_source_text
+from log_templates import mask_volatile_tokens
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Chunk deduplication requires NumPy: pip install numpy")
+
+
+class MinHasher:
+    """
+    MinHash signatures of word shingles.
+
+    Each shingle is hashed once (CRC-32) and the num_perm hash functions are
+    multiply-shift permutations applied to all shingles at once in NumPy.
+    """
+
+    __slots__ = ('num_perm', 'shingle_size', '_a', '_b')
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        _require_numpy()
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Odd multipliers: h(x) = (a * x + b) mod 2**64, top 32 bits
+        self._a = (rng.randint(0, 2 ** 31, num_perm, dtype=np.uint64) << np.uint64(33)) | \
+            (rng.randint(0, 2 ** 32, num_perm, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+        self._b = (rng.randint(0, 2 ** 32, num_perm, dtype=np.uint64) << np.uint64(32)) | \
+            rng.randint(0, 2 ** 32, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> "np.ndarray":
+        """CRC-32 of every distinct word shingle (the text itself if shorter)."""
+        words = text.split()
+        size = self.shingle_size
+        if len(words) <= size:
+            grams = {' '.join(words)}
+        else:
+            grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> "np.ndarray":
+        """
+        MinHash signature of a text.
+
+        Args:
+            text: Already normalized text
+
+        Returns:
+            uint32 array of num_perm minima
+        """
+        hashes = self.shingles(text)
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+class DuplicateLink(NamedTuple):
+    """A chunk that was found to be a near-duplicate of an indexed one."""
+
+    key: Hashable        # Key of the dropped/linked chunk
+    original: Hashable   # Key of the chunk it duplicates
+    similarity: float    # Estimated Jaccard similarity of their shingles
+
+
+class ChunkDeduplicator:
+    """
+    Near-duplicate detection over chunks, across jobs.
+
+    Chunks are normalized (mask_volatile_tokens by default, or e.g.
+    TemplateTable.template_text), MinHashed
+    and bucketed by LSH: the signature is cut into bands, and chunks sharing
+    any band's hash are candidates. A candidate counts as a duplicate when
+    the estimated Jaccard similarity is at least threshold. Only chunks that
+    were not duplicates are indexed, so the first occurrence is the
+    original every later re-run links to.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 3, normalize: Optional[Callable[[str], str]] = mask_volatile_tokens,
+                 seed: int = 1):
+        """
+        Initialize an empty deduplicator.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of a duplicate
+            num_perm: MinHash signature length
+            bands: LSH bands; num_perm must be a multiple. More bands find
+                   less similar candidates (about (1/bands)**(bands/num_perm))
+            shingle_size: Words per shingle
+            normalize: Text normalizer applied before hashing (None: raw text)
+            seed: Seed of the hash functions (must match to share signatures)
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.normalize = normalize
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self._rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Hashable, "np.ndarray"] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> "np.ndarray":
+        if self.normalize is not None:
+            text = self.normalize(text)
+        return self.hasher.signature(text)
+
+    def _bands(self, signature: "np.ndarray") -> Iterable[bytes]:
+        rows = self._rows
+        data = signature.tobytes()
+        width = rows * 4
+        return (data[band * width:(band + 1) * width] for band in range(self.bands))
+
+    def query(self, text: str, signature: Optional["np.ndarray"] = None) -> Optional[Tuple[Hashable, float]]:
+        """
+        Most similar indexed chunk at or above the threshold.
+
+        Args:
+            text: Chunk text
+            signature: Precomputed signature of text
+
+        Returns:
+            (key, estimated similarity), or None if there is no near-duplicate
+        """
+        if signature is None:
+            signature = self.signature(text)
+        best: Optional[Tuple[Hashable, float]] = None
+        seen = set()
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            for key in buckets.get(band, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                similarity = float(np.count_nonzero(self._signatures[key] == signature)) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (key, similarity)
+        return best
+
+    def add(self, key: Hashable, text: str) -> Optional[DuplicateLink]:
+        """
+        Check a chunk and index it unless it is a near-duplicate.
+
+        Args:
+            key: Identifier of the chunk, e.g. (job_id, chunk_index)
+            text: Chunk text
+
+        Returns:
+            DuplicateLink to the original, or None if the chunk was indexed
+        """
+        signature = self.signature(text)
+        match = self.query(text, signature)
+        if match is not None:
+            return DuplicateLink(key, match[0], match[1])
+        self._signatures[key] = signature
+        for buckets, band in zip(self._buckets, self._bands(signature)):
+            buckets.setdefault(band, []).append(key)
+        return None
+
+    def deduplicate(self, job_id: Hashable, chunks: Iterable[Any],
+                    log_text: Optional[str] = None) -> Tuple[List[Any], List[DuplicateLink]]:
+        """
+        Split one job's chunks into new ones and near-duplicates of earlier chunks.
+
+        Args:
+            job_id: Job the chunks belong to; chunk keys are (job_id, position)
+            chunks: Chunk objects (with .text), metadata dictionaries or
+                    ChunkMetadata records (chunk_text)
+            log_text: Full log text, needed when chunk_text was not kept
+
+        Returns:
+            (chunks to embed and store, links of the dropped duplicates)
+        """
+        unique = []
+        links = []
+        for position, chunk in enumerate(chunks):
+            if hasattr(chunk, 'text'):
+                text = chunk.text
+            else:
+                text = chunk_source_text(chunk, log_text)
+                position = chunk.get('chunk_index', position)
+            link = self.add((job_id, position), text)
+            if link is None:
+                unique.append(chunk)
+            else:
+                links.append(link)
+        return unique, links
@@ -0,0 +1,401 @@
+import fnmatch
+import json
+import os
+import pickle
+import re
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Metadata fields that are indexed; list fields index every value
+INDEXED_FIELDS: Tuple[str, ...] = ('hosts', 'task_names', 'error_types', 'playbook_name', 'chunk_type')
+
+_MANIFEST = "manifest.json"
+
+# Segment file layout: magic, header length, pickled (jobs, term dictionary),
+# then the compressed postings the term dictionary points into
+_SEGMENT_MAGIC = b"ACIX1\n"
+_HEADER_LENGTH = struct.Struct("<Q")
+
+# Term dictionary of one segment: field -> value -> (offset, length) of its
+# postings, counted from the end of the header
+TermDictionary = Dict[str, Dict[str, Tuple[int, int]]]
+
+
+class Posting(NamedTuple):
+    """One chunk a term occurs in."""
+
+    job_id: str
+    chunk_index: int
+    start: int  # -1 when the metadata has no offsets (langchain strings)
+    end: int
+
+
+def _field_values(metadata: Dict[str, Any], field: str) -> Iterable[str]:
+    """Distinct values of one indexed field of a chunk's metadata."""
+    if field == 'error_types':
+        counts = metadata.get('error_type_counts')
+        if counts is not None:
+            return counts.keys()
+    value = metadata.get(field)
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return set(value)
+
+
+def _encode_postings(rows: List[Tuple[int, int, int, int]]) -> bytes:
+    """
+    Compress sorted (job, chunk_index, start, end) rows.
+
+    Stored as four delta/length columns of int64 (job deltas, chunk index
+    deltas within a job, start + 1, end - start), then zlib'd; the small,
+    repetitive integers compress to a few bytes per posting.
+    """
+    jobs = array('q')
+    chunks = array('q')
+    starts = array('q')
+    lengths = array('q')
+    previous_job = previous_chunk = 0
+    for job, chunk_index, start, end in rows:
+        if job != previous_job:
+            previous_chunk = 0
+        jobs.append(job - previous_job)
+        chunks.append(chunk_index - previous_chunk)
+        starts.append(start + 1)
+        lengths.append(end - start)
+        previous_job, previous_chunk = job, chunk_index
+    return zlib.compress(jobs.tobytes() + chunks.tobytes() + starts.tobytes() + lengths.tobytes())
+
+
+def _decode_postings(data: bytes) -> List[Tuple[int, int, int, int]]:
+    values = array('q')
+    values.frombytes(zlib.decompress(data))
+    count = len(values) // 4
+    jobs = list(accumulate(values[:count]))
+    rows = []
+    chunk_index = 0
+    previous_job = None
+    for job, chunk_delta, start, length in zip(jobs, values[count:2 * count],
+                                               values[2 * count:3 * count], values[3 * count:]):
+        chunk_index = chunk_delta if job != previous_job else chunk_index + chunk_delta
+        previous_job = job
+        rows.append((job, chunk_index, start - 1, start - 1 + length))
+    return rows
+
+
+class _Segment:
+    """
+    One immutable index file: a job table and a term dictionary.
+
+    Only the dictionary is held in memory; the postings of a term are read
+    from the file when it is looked up.
+    """
+
+    __slots__ = ("name", "path", "base", "jobs", "terms")
+
+    def __init__(self, name: str, path: str, base: int, jobs: List[str], terms: TermDictionary):
+        self.name = name
+        self.path = path
+        self.base = base  # File offset where the postings start
+        self.jobs = jobs
+        self.terms = terms
+
+    def read(self, locations: List[Tuple[int, int]]) -> List[bytes]:
+        """Postings data at the given (offset, length) locations, in order."""
+        blocks = []
+        with open(self.path, 'rb') as file:
+            for offset, length in locations:
+                file.seek(self.base + offset)
+                blocks.append(file.read(length))
+        return blocks
+
+
+class ChunkIndex:
+    """
+    On-disk inverted index from metadata values to the chunks they occur in.
+
+    Maps (field, value) for INDEXED_FIELDS, e.g. ('hosts', 'bastion') or
+    ('error_types', 'HOST_UNREACHABLE'), to postings of (job_id,
+    chunk_index, start, end), so "which chunks across last week's jobs
+    mention this host" is a lookup instead of a re-scan of every log.
+
+    Updates are incremental: add() buffers jobs and commit() writes them as
+    a new segment file, leaving existing segments untouched. Re-adding a
+    job supersedes its earlier postings. compact() merges all segments into
+    one. Files are written atomically (temp file + rename), like ChunkCache.
+
+    Each segment starts with a term dictionary, which is all that is kept
+    in memory: a lookup reads postings only from segments that have the
+    term, and match() resolves wildcard patterns against the dictionary.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Open (or create) an index.
+
+        Args:
+            directory: Directory holding the manifest and segment files
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Tuple[int, int, int, Dict[str, Iterable[str]]]]] = {}
+        self._segments: Dict[str, _Segment] = {}
+        manifest_path = os.path.join(directory, _MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as file:
+                manifest = json.load(file)
+        else:
+            manifest = {"next_segment": 0, "segments": [], "jobs": {}}
+        self._next_segment: int = manifest["next_segment"]
+        self._segment_names: List[str] = manifest["segments"]
+        # job_id -> segment holding its current postings
+        self._job_segments: Dict[str, str] = manifest["jobs"]
+
+    def __len__(self) -> int:
+        return len(self._job_segments)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._job_segments or job_id in self._pending
+
+    def add(self, job_id: str, metadata_chunks: Iterable[Dict[str, Any]]) -> None:
+        """
+        Buffer one job's chunk metadata for the next commit().
+
+        Args:
+            job_id: Job identifier stored in the postings
+            metadata_chunks: Metadata dictionaries (or ChunkMetadata records)
+                             from either extractor
+        """
+        rows = []
+        for metadata in metadata_chunks:
+            start = metadata.get('chonkie_start')
+            end = metadata.get('chonkie_end')
+            if start is None or end is None:
+                start = end = -1
+            terms = {field: _field_values(metadata, field) for field in INDEXED_FIELDS}
+            rows.append((metadata['chunk_index'], start, end, terms))
+        with self._lock:
+            self._pending[job_id] = rows
+
+    def commit(self) -> Optional[str]:
+        """
+        Write buffered jobs as a new segment.
+
+        Returns:
+            Name of the segment written, or None if nothing was buffered
+        """
+        with self._lock:
+            if not self._pending:
+                return None
+            pending, self._pending = self._pending, {}
+            name = f"segment-{self._next_segment:06d}.idx"
+            self._next_segment += 1
+
+            jobs = list(pending)
+            terms: Dict[Tuple[str, str], List[Tuple[int, int, int, int]]] = {}
+            for job, job_id in enumerate(jobs):
+                for chunk_index, start, end, values in pending[job_id]:
+                    for field, field_values in values.items():
+                        for value in field_values:
+                            terms.setdefault((field, value), []).append((job, chunk_index, start, end))
+            segment = self._write_segment(name, jobs, {
+                term: _encode_postings(rows) for term, rows in terms.items()
+            })
+            self._segments[name] = segment
+            self._segment_names.append(name)
+            for job_id in jobs:
+                self._job_segments[job_id] = name
+            self._drop_unreferenced()
+            self._write_manifest()
+            return name
+
+    def postings(self, field: str, value: str) -> List[Posting]:
+        """
+        Chunks whose metadata has value in field (committed jobs only).
+
+        Args:
+            field: One of INDEXED_FIELDS
+            value: Field value, e.g. a host name or error type
+
+        Returns:
+            Postings ordered by segment, job and chunk_index
+        """
+        return self._lookup(field, lambda values: [value] if value in values else [])
+
+    def match(self, field: str, pattern: str) -> List[Posting]:
+        """
+        Chunks whose metadata has a value in field matching a wildcard pattern.
+
+        Patterns use fnmatch syntax (case-sensitive) and are resolved
+        against the term dictionaries only, e.g. hosts='bastion.*.internal'.
+
+        Args:
+            field: One of INDEXED_FIELDS
+            pattern: fnmatch pattern ('*', '?', '[seq]')
+
+        Returns:
+            Postings ordered by segment, job and chunk_index, each chunk once
+        """
+        regex = re.compile(fnmatch.translate(pattern))
+        return self._lookup(field, lambda values: [value for value in values if regex.match(value)])
+
+    def _lookup(self, field: str, select: Callable[[Dict[str, Tuple[int, int]]], List[str]]
+                ) -> List[Posting]:
+        """Postings of the values select() picks from each segment's dictionary."""
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Field is not indexed: {field!r}")
+        results = []
+        with self._lock:
+            names = list(self._segment_names)
+        for name in names:
+            segment = self._segment(name)
+            field_terms = segment.terms.get(field, {})
+            selected = select(field_terms)
+            if not selected:
+                continue
+            rows = set()
+            for data in segment.read([field_terms[value] for value in selected]):
+                rows.update(_decode_postings(data))
+            for job, chunk_index, start, end in sorted(rows):
+                job_id = segment.jobs[job]
+                if self._job_segments.get(job_id) == name:  # Skip superseded versions
+                    results.append(Posting(job_id, chunk_index, start, end))
+        return results
+
+    def search(self, **criteria: str) -> List[Posting]:
+        """
+        Chunks matching every field=value criterion.
+
+        Example: index.search(hosts='bastion', error_types='TASK_FAILED')
+
+        Returns:
+            Postings present for all criteria
+        """
+        if not criteria:
+            raise ValueError("search() needs at least one field=value criterion")
+        results: Optional[List[Posting]] = None
+        for field, value in criteria.items():
+            postings = self.postings(field, value)
+            if results is None:
+                results = postings
+            else:
+                keep = set(postings)
+                results = [posting for posting in results if posting in keep]
+            if not results:
+                return []
+        return results
+
+    def values(self, field: str) -> Set[str]:
+        """All values indexed for a field (including superseded jobs)."""
+        with self._lock:
+            names = list(self._segment_names)
+        return {value for name in names for value in self._segment(name).terms.get(field, ())}
+
+    def compact(self) -> Optional[str]:
+        """
+        Merge all committed segments into one, dropping superseded postings.
+
+        Returns:
+            Name of the merged segment, or None if there was nothing to merge
+        """
+        with self._lock:
+            names = list(self._segment_names)
+        if len(names) < 2:
+            return None
+        jobs: List[str] = []
+        job_numbers: Dict[str, int] = {}
+        terms: Dict[Tuple[str, str], List[Tuple[int, int, int, int]]] = {}
+        for name in names:
+            segment = self._segment(name)
+            segment_terms = [(field, value) for field, values in segment.terms.items() for value in values]
+            blocks = segment.read([segment.terms[field][value] for field, value in segment_terms])
+            for term, data in zip(segment_terms, blocks):
+                for job, chunk_index, start, end in _decode_postings(data):
+                    job_id = segment.jobs[job]
+                    if self._job_segments.get(job_id) != name:
+                        continue
+                    number = job_numbers.get(job_id)
+                    if number is None:
+                        number = job_numbers[job_id] = len(jobs)
+                        jobs.append(job_id)
+                    terms.setdefault(term, []).append((number, chunk_index, start, end))
+
+        with self._lock:
+            name = f"segment-{self._next_segment:06d}.idx"
+            self._next_segment += 1
+            segment = self._write_segment(name, jobs, {
+                term: _encode_postings(sorted(rows)) for term, rows in terms.items()
+            })
+            self._segments[name] = segment
+            # Segments committed while merging stay after the merged one
+            self._segment_names.insert(0, name)
+            for job_id in jobs:
+                if self._job_segments.get(job_id) in names:
+                    self._job_segments[job_id] = name
+            self._drop_unreferenced()
+            self._write_manifest()
+            return name
+
+    def _segment(self, name: str) -> _Segment:
+        segment = self._segments.get(name)
+        if segment is None:
+            path = os.path.join(self.directory, name)
+            with open(path, 'rb') as file:
+                if file.read(len(_SEGMENT_MAGIC)) != _SEGMENT_MAGIC:
+                    raise ValueError(f"Not a chunk index segment: {path}")
+                (length,) = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+                jobs, terms = pickle.loads(file.read(length))
+            base = len(_SEGMENT_MAGIC) + _HEADER_LENGTH.size + length
+            segment = self._segments[name] = _Segment(name, path, base, jobs, terms)
+        return segment
+
+    def _drop_unreferenced(self) -> None:
+        """Delete segments none of whose jobs are current any more."""
+        live = set(self._job_segments.values())
+        for name in [name for name in self._segment_names if name not in live]:
+            self._segment_names.remove(name)
+            self._segments.pop(name, None)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def _write_segment(self, name: str, jobs: List[str],
+                       postings: Dict[Tuple[str, str], bytes]) -> _Segment:
+        # Lay out postings by field and value and point the dictionary at them
+        ordered = sorted(postings)
+        terms: TermDictionary = {}
+        position = 0
+        for field, value in ordered:
+            length = len(postings[field, value])
+            terms.setdefault(field, {})[value] = (position, length)
+            position += length
+        header = pickle.dumps((jobs, terms), protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_atomic(name, b"".join(
+            [_SEGMENT_MAGIC, _HEADER_LENGTH.pack(len(header)), header]
+            + [postings[term] for term in ordered]
+        ))
+        base = len(_SEGMENT_MAGIC) + _HEADER_LENGTH.size + len(header)
+        return _Segment(name, os.path.join(self.directory, name), base, jobs, terms)
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "next_segment": self._next_segment,
+            "segments": self._segment_names,
+            "jobs": self._job_segments,
+        }
+        self._write_atomic(_MANIFEST, json.dumps(manifest).encode())
+
+    def _write_atomic(self, name: str, data: bytes) -> None:
+        # Write then rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, os.path.join(self.directory, name))
@@ -0,0 +1,265 @@
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ansible_scanner import scan_status_offsets
+from chonkie_chunking import extract_ansible_metadata_from_chonkie_chunks
+
+# Keys of the metadata dictionaries, in the order the extractors build them
+METADATA_KEYS = (
+    'chunk_index', 'chunk_text', 'chunk_type', 'chonkie_level', 'chonkie_start',
+    'chonkie_end', 'chonkie_token_count', 'playbook_name', 'task_names', 'hosts',
+    'statuses', 'timestamps', 'has_error', 'error_types', 'durations',
+    'retry_counts', 'host_stats', 'task_timings',
+)
+
+# Fields left as None until they have content
+_LIST_FIELDS = frozenset(['task_names', 'hosts', 'timestamps', 'durations', 'retry_counts', 'task_timings'])
+_DICT_FIELDS = frozenset(['host_stats'])
+
+# Keys present only once filled in: line_kinds (extracted with a LineIndex),
+# chunk_segments (host-sharded chunks) and template_counts
+# (log_templates.add_template_features)
+_OPTIONAL_KEYS = ('line_kinds', 'chunk_segments', 'template_counts')
+
+# Keys a record answers besides METADATA_KEYS
+_EXTRA_KEYS = frozenset(('status_counts', 'error_type_counts') + _OPTIONAL_KEYS)
+
+
+def _expand(counts: Optional[Dict[str, int]]) -> List[str]:
+    """Counter -> the repeated-string list the metadata dictionaries use."""
+    if not counts:
+        return []
+    expanded: List[str] = []
+    for name, count in counts.items():
+        expanded.extend([name] * count)
+    return expanded
+
+
+def _count(names: List[str]) -> Optional[Dict[str, int]]:
+    """Repeated-string list -> {name: count} in first-seen order, None if empty."""
+    counts: Dict[str, int] = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    return counts or None
+
+
+class ChunkMetadata:
+    """
+    Compact metadata record for one chunk.
+
+    Holds the same information as the metadata dictionaries, but list and
+    dict fields stay None until they have content, and statuses and error
+    types are stored as {name: count} counters instead of repeated strings.
+    Supports metadata['key'] and metadata.get('key') with the dictionary
+    semantics, so alert rules and other dict consumers accept it, and
+    to_dict() converts it back. Without chunk text, records take about
+    20-35% less memory than the dictionaries on the bundled logs (depending
+    on the splitter); most of the rest is the task_names, timestamps and
+    durations lists, which are kept as they are.
+    """
+
+    __slots__ = (
+        'chunk_index', 'chunk_text', 'chunk_type', 'chonkie_level', 'chonkie_start',
+        'chonkie_end', 'chonkie_token_count', 'playbook_name', 'task_names', 'hosts',
+        'status_counts', 'timestamps', 'has_error', 'error_type_counts', 'durations',
+        'retry_counts', 'host_stats', 'task_timings', 'line_kinds', 'chunk_segments', 'template_counts',
+        '_statuses', '_error_types',
+    )
+
+    def __init__(self, chunk_index: int, chunk_text: Optional[str], chonkie_level: int,
+                 chonkie_start: int, chonkie_end: int, chonkie_token_count: int):
+        self.chunk_index = chunk_index
+        self.chunk_text = chunk_text
+        self.chunk_type = 'standard'
+        self.chonkie_level = chonkie_level
+        self.chonkie_start = chonkie_start
+        self.chonkie_end = chonkie_end
+        self.chonkie_token_count = chonkie_token_count
+        self.playbook_name: Optional[str] = None
+        self.task_names: Optional[List[str]] = None
+        self.hosts: Optional[List[str]] = None
+        self.status_counts: Optional[Dict[str, int]] = None
+        self.timestamps: Optional[List[str]] = None
+        self.has_error = False
+        self.error_type_counts: Optional[Dict[str, int]] = None
+        self.durations: Optional[List[str]] = None
+        self.retry_counts: Optional[List[int]] = None
+        self.host_stats: Optional[Dict[str, Dict[str, int]]] = None
+        self.task_timings: Optional[List[Dict[str, Any]]] = None
+        self.line_kinds: Optional[Dict[str, int]] = None
+        self.chunk_segments: Optional[List[Tuple[int, int]]] = None
+        self.template_counts: Optional[Dict[int, int]] = None
+        self._statuses: Optional[List[str]] = None
+        self._error_types: Optional[List[str]] = None
+
+    @property
+    def statuses(self) -> List[str]:
+        """Statuses as the repeated-string list of the dictionaries (built once; do not modify)."""
+        if self._statuses is None:
+            self._statuses = _expand(self.status_counts)
+        return self._statuses
+
+    @property
+    def error_types(self) -> List[str]:
+        """Error types as the repeated-string list of the dictionaries (built once; do not modify)."""
+        if self._error_types is None:
+            self._error_types = _expand(self.error_type_counts)
+        return self._error_types
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in METADATA_KEYS and key not in _EXTRA_KEYS:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            if key in _OPTIONAL_KEYS:
+                raise KeyError(key)
+            if key in _LIST_FIELDS:
+                return []
+            if key in _DICT_FIELDS:
+                return {}
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        if key in _OPTIONAL_KEYS:
+            return getattr(self, key) is not None
+        return key in METADATA_KEYS or key in _EXTRA_KEYS
+
+    def keys(self) -> Iterator[str]:
+        return iter(METADATA_KEYS + tuple(key for key in _OPTIONAL_KEYS if getattr(self, key) is not None))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the metadata dictionary the extractors return."""
+        return {key: self[key] for key in self.keys()}
+
+    @classmethod
+    def from_dict(cls, metadata: Dict[str, Any]) -> "ChunkMetadata":
+        """
+        Build a record from a metadata dictionary (e.g. a ChunkCache hit).
+
+        Args:
+            metadata: Dictionary from extract_ansible_metadata_from_chonkie_chunks,
+                      in the list or the counters=True form
+
+        Returns:
+            Equivalent ChunkMetadata
+        """
+        record = cls(
+            metadata['chunk_index'], metadata['chunk_text'], metadata['chonkie_level'],
+            metadata['chonkie_start'], metadata['chonkie_end'], metadata['chonkie_token_count'],
+        )
+        record.chunk_type = metadata['chunk_type']
+        record.playbook_name = metadata['playbook_name']
+        record.has_error = metadata['has_error']
+        for key in _LIST_FIELDS | _DICT_FIELDS:
+            setattr(record, key, metadata[key] or None)
+        record.line_kinds = metadata.get('line_kinds')
+        record.chunk_segments = metadata.get('chunk_segments')
+        record.template_counts = metadata.get('template_counts')
+        if 'status_counts' in metadata:
+            record.status_counts = metadata['status_counts'] or None
+            record.error_type_counts = metadata['error_type_counts'] or None
+        else:
+            record.status_counts = _count(metadata['statuses'])
+            record.error_type_counts = _count(metadata['error_types'])
+        return record
+
+    def __repr__(self) -> str:
+        return (
+            f"ChunkMetadata(chunk_index={self.chunk_index}, chunk_type={self.chunk_type!r}, "
+            f"has_error={self.has_error}, statuses={self.status_counts})"
+        )
+
+
+def extract_ansible_metadata_records(chunks, first_index: int = 0,
+                                     include_text: bool = True,
+                                     line_index=None) -> List[ChunkMetadata]:
+    """
+    Extract ChunkMetadata records from Chonkie chunks.
+
+    A view over extract_ansible_metadata_from_chonkie_chunks (counter
+    form), so both share one extraction. The one difference in to_dict():
+    error types of a PLAY RECAP are grouped by type instead of listed per
+    host.
+
+    Args:
+        chunks: Sequence of RecursiveChunk (or OffsetChunk, HostChunk) objects
+        first_index: chunk_index assigned to the first chunk
+        include_text: Keep each chunk's text in chunk_text
+        line_index: Optional LineIndex; fills line_kinds
+
+    Returns:
+        List of ChunkMetadata records
+    """
+    metadata_chunks = extract_ansible_metadata_from_chonkie_chunks(
+        chunks, first_index, include_text, counters=True, line_index=line_index,
+    )
+    return [ChunkMetadata.from_dict(metadata) for metadata in metadata_chunks]
+
+
+def chunk_source_text(metadata, log_text: Optional[str] = None) -> str:
+    """
+    Text of one chunk: its chunk_text, or rebuilt from the full log.
+
+    Host-sharded chunks are rebuilt from their chunk_segments, since their
+    text is not the contiguous chonkie_start:chonkie_end range.
+
+    Args:
+        metadata: Metadata dictionary or ChunkMetadata of one chunk
+        log_text: Full log text, needed when the chunk_text was not kept
+
+    Returns:
+        Chunk text
+    """
+    text = metadata['chunk_text']
+    if text is None:
+        if log_text is None:
+            raise ValueError("chunk_text was not kept; pass log_text")
+        segments = metadata.get('chunk_segments')
+        if segments:
+            text = ''.join(log_text[start:end] for start, end in segments)
+        else:
+            text = log_text[metadata['chonkie_start']:metadata['chonkie_end']]
+    return text
+
+
+def status_offsets(metadata, log_text: Optional[str] = None,
+                   statuses: Optional[Iterable[str]] = None) -> Dict[str, List[int]]:
+    """
+    Occurrence offsets behind a chunk's status counts, computed on demand.
+
+    Args:
+        metadata: Metadata dictionary or ChunkMetadata of one chunk
+        log_text: Full log text, needed when the chunk_text was not kept
+        statuses: Statuses to report (default: all)
+
+    Returns:
+        {status: [offset, ...]} with offsets into the log
+    """
+    text = chunk_source_text(metadata, log_text)
+    found = scan_status_offsets(text, statuses)
+    segments = metadata.get('chunk_segments')
+    if not segments:
+        start = metadata['chonkie_start']
+        return {status: [start + offset for offset in offsets] for status, offsets in found.items()}
+
+    # Offsets into the joined text of a host-sharded chunk: map each back
+    # through the segment it falls in
+    text_starts = []
+    position = 0
+    for start, end in segments:
+        text_starts.append(position)
+        position += end - start
+    mapped = {}
+    for status, offsets in found.items():
+        positions = []
+        for offset in offsets:
+            segment = bisect_right(text_starts, offset) - 1
+            positions.append(segments[segment][0] + offset - text_starts[segment])
+        mapped[status] = positions
+    return mapped
@@ -1,6 +1,88 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 import re
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import List, Dict, Any, Optional
+
+from ansible_scanner import STATUS_ORDER, scan_chunk, parse_host_stats, parse_task_timings
+from splitter_registry import default_registry, WARMUP_LOG
+from alert_rules import AlertRuleEngine, get_default_alert_engine
+
+
+class LogChunk:
+    """
+    Chunk of a log with its position, as returned by split_text_with_offsets.
+    
+    Has the attributes of Chonkie's RecursiveChunk (text, start_index,
+    end_index, token_count, level), so the Chonkie metadata extractor and
+    anything indexing Chonkie chunks accept it unchanged. level is the
+    separator recursion depth the chunk was produced at.
+    """
+    
+    __slots__ = ("text", "start_index", "end_index", "token_count", "level")
+    
+    def __init__(self, text: str, start_index: int, end_index: int, token_count: int, level: int):
+        self.text = text
+        self.start_index = start_index
+        self.end_index = end_index
+        self.token_count = token_count
+        self.level = level
+    
+    def __len__(self) -> int:
+        return self.token_count
+    
+    def __repr__(self) -> str:
+        return (
+            f"LogChunk(start_index={self.start_index}, end_index={self.end_index}, "
+            f"token_count={self.token_count}, level={self.level})"
+        )
+
+
+# Characters that make a separator a regex rather than a literal string
+_REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+# Regex constructs that see text before pos: lookbehind, word boundaries, '^'
+_CONTEXT_SENSITIVE = re.compile(r'\(\?<[=!]|\\[bBA]|\^')
+
+
+class _Separator:
+    """
+    One splitter separator, compiled once and matched in place.
+    
+    langchain re-splits a copy of every piece with re.split(f"({sep})")
+    at each level. Here the pattern is run over the full text between the
+    piece's offsets (pos/endpos), which is equivalent for literals and most
+    regexes. langchain compiles separators without MULTILINE, so a
+    '^'-anchored separator can only match at the piece start and is matched
+    there. Patterns that look outside their bounds (lookbehind, \\b, inner
+    '^') still run on a copy of the piece.
+    """
+    
+    __slots__ = ("anchored", "pattern", "sliced")
+    
+    def __init__(self, separator: str, is_regex: bool):
+        if not is_regex or not _REGEX_METACHARACTERS.intersection(separator):
+            separator = re.escape(separator)
+        self.anchored = separator.startswith('^') and '|' not in separator
+        self.pattern = re.compile(separator[1:] if self.anchored else separator)
+        self.sliced = bool(_CONTEXT_SENSITIVE.search(self.pattern.pattern))
+    
+    def split_points(self, text: str, start: int, end: int) -> Optional[List[int]]:
+        """
+        Offsets where re.split would cut text[start:end] at this separator.
+        
+        Returns:
+            Sorted match offsets, or None if the separator does not occur
+        """
+        if self.sliced:
+            piece, pos, endpos, base = text[start:end], 0, end - start, start
+        else:
+            piece, pos, endpos, base = text, start, end, 0
+        if self.anchored:
+            # The only match is at the piece start, which leaves it whole
+            return [] if self.pattern.match(piece, pos, endpos) else None
+        points = [base + match.start() for match in self.pattern.finditer(piece, pos, endpos)]
+        return points or None
+
 
 class AnsibleLogSplitter(RecursiveCharacterTextSplitter):
     """
@@ -90,7 +172,126 @@ class AnsibleLogSplitter(RecursiveCharacterTextSplitter):
             keep_separator="start",  # Put headers at start of chunks for clarity
             **kwargs
         )
+        self._compiled_separators = {
+            separator: _Separator(separator, self._is_separator_regex)
+            for separator in self._separators if separator
+        }
+    
+    def split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks (same output as RecursiveCharacterTextSplitter).
+        
+        Args:
+            text: Raw Ansible log content
+            
+        Returns:
+            List of chunk text strings
+        """
+        return [chunk.text for chunk in self.split_text_with_offsets(text)]
+    
+    def split_text_with_offsets(self, text: str) -> List[LogChunk]:
+        """
+        Split text like split_text, keeping each chunk's position in the log.
+        
+        Separators are kept at the start of each piece, so every chunk is a
+        contiguous slice of the text (minus stripped whitespace) and its
+        offsets are tracked through the split instead of searched for
+        afterwards; overlapping chunks are unambiguous.
+        
+        Args:
+            text: Raw Ansible log content
+            
+        Returns:
+            List of LogChunk objects; their texts equal split_text(text)
+        """
+        chunks: List[LogChunk] = []
+        self._split_range(text, 0, len(text), self._separators, 0, chunks)
+        return chunks
+    
+    def _split_range(self, text: str, start: int, end: int, separators: List[str],
+                     level: int, chunks: List[LogChunk]) -> None:
+        """
+        RecursiveCharacterTextSplitter._split_text over text[start:end].
+        
+        Works on offsets: the piece is never copied out, and the search for
+        the first matching separator already yields its split points, so
+        each level scans its pieces once.
+        """
+        points: List[int] = []
+        new_separators: List[str] = []
+        for i, separator in enumerate(separators):
+            if separator == "":
+                points = list(range(start + 1, end))
+                break
+            found = self._compiled_separators[separator].split_points(text, start, end)
+            if found is not None:
+                points = found
+                new_separators = separators[i + 1:]
+                break
+        
+        # Piece k is text[cuts[k]:cuts[k + 1]]; sizes are cumulative lengths
+        cuts = [start]
+        cuts.extend(points[1:] if points and points[0] == start else points)
+        cuts.append(end)
+        if self._length_function is len:
+            sizes = cuts
+        else:
+            sizes = [0]
+            sizes.extend(accumulate(self._length_function(text[a:b]) for a, b in zip(cuts, cuts[1:])))
+        
+        chunk_size = self._chunk_size
+        first = 0
+        for k in [k for k in range(len(cuts) - 1) if sizes[k + 1] - sizes[k] >= chunk_size]:
+            if first < k:
+                self._merge_pieces(text, cuts, sizes, first, k, level, chunks)
+            if not new_separators:
+                # Emitted as is, like langchain (no whitespace stripping)
+                chunks.append(LogChunk(text[cuts[k]:cuts[k + 1]], cuts[k], cuts[k + 1],
+                                       sizes[k + 1] - sizes[k], level))
+            else:
+                self._split_range(text, cuts[k], cuts[k + 1], new_separators, level + 1, chunks)
+            first = k + 1
+        if first < len(cuts) - 1:
+            self._merge_pieces(text, cuts, sizes, first, len(cuts) - 1, level, chunks)
     
+    def _merge_pieces(self, text: str, cuts: List[int], sizes: List[int], first: int, stop: int,
+                      level: int, chunks: List[LogChunk]) -> None:
+        """
+        TextSplitter._merge_splits over the adjacent pieces first..stop-1.
+        
+        The pieces of a document are contiguous, so its length is a
+        difference of cumulative sizes and both the piece that overflows it
+        and the overlap to keep are found by bisection instead of adding and
+        popping pieces one at a time.
+        """
+        chunk_size = self._chunk_size
+        chunk_overlap = self._chunk_overlap
+        while True:
+            # First piece whose addition makes the document exceed chunk_size
+            overflow = bisect_right(sizes, sizes[first] + chunk_size, first + 1, stop + 1) - 1
+            if overflow >= stop:
+                break
+            self._append_range(text, cuts[first], cuts[overflow], level, chunks)
+            # Keep the longest tail that fits the overlap and leaves room for the piece
+            first = bisect_left(
+                sizes,
+                max(sizes[overflow] - chunk_overlap, sizes[overflow + 1] - chunk_size),
+                first, overflow,
+            )
+        self._append_range(text, cuts[first], cuts[stop], level, chunks)
+    
+    def _append_range(self, text: str, start: int, end: int, level: int,
+                      chunks: List[LogChunk]) -> None:
+        chunk_text = text[start:end]
+        if self._strip_whitespace:
+            stripped = chunk_text.lstrip()
+            start += len(chunk_text) - len(stripped)
+            chunk_text = stripped.rstrip()
+            end = start + len(chunk_text)
+        if chunk_text:
+            chunks.append(LogChunk(chunk_text, start, end, self._length_function(chunk_text), level))
+
+
 def extract_ansible_metadata_from_chunks(chunks: List[str]) -> List[Dict[str, Any]]:
     """
     Extract Ansible-specific metadata from text chunks for monitoring system.
@@ -121,140 +322,63 @@ def extract_ansible_metadata_from_chunks(chunks: List[str]) -> List[Dict[str, An
             'task_timings': []  # For TASKS RECAP timings
         }
         
+        # Collect every marker, host, status and timing in one pass
+        scan = scan_chunk(chunk)
+        
         # Check if this is a RECAP chunk (highest priority)
-        if re.search(r'^PLAY RECAP \*+', chunk, re.MULTILINE):
+        if any(offset == 0 or chunk[offset - 1] == '\n' for offset in scan.play_recap_offsets):
             metadata['chunk_type'] = 'RECAP'
             metadata['status'] = 'SUMMARY'
             
             # Extract host statistics from PLAY RECAP
-            host_stat_pattern = r'^([\w\.\-]+)\s*:\s*ok=(\d+)\s+changed=(\d+)\s+unreachable=(\d+)\s+failed=(\d+)\s+skipped=(\d+)\s+rescued=(\d+)\s+ignored=(\d+)'
-            host_stats = re.findall(host_stat_pattern, chunk, re.MULTILINE)
-            
-            for host_stat in host_stats:
-                hostname, ok, changed, unreachable, failed, skipped, rescued, ignored = host_stat
-                metadata['host_stats'][hostname] = {
-                    'ok': int(ok),
-                    'changed': int(changed), 
-                    'unreachable': int(unreachable),
-                    'failed': int(failed),
-                    'skipped': int(skipped),
-                    'rescued': int(rescued),
-                    'ignored': int(ignored)
-                }
+            for hostname, stats in parse_host_stats(chunk):
+                metadata['host_stats'][hostname] = stats
                 
                 # Determine overall status from host stats
-                if int(failed) > 0 or int(unreachable) > 0:
+                if stats['failed'] > 0 or stats['unreachable'] > 0:
                     metadata['has_error'] = True
-                    if int(unreachable) > 0:
+                    if stats['unreachable'] > 0:
                         metadata['error_types'].append('HOST_UNREACHABLE_SUMMARY')
-                    if int(failed) > 0:
+                    if stats['failed'] > 0:
                         metadata['error_types'].append('TASK_FAILED_SUMMARY')
             
             # Extract all hosts mentioned in RECAP
             metadata['hosts'] = list(metadata['host_stats'].keys())
         
-        # Extract task timings from TASKS RECAP section (explicit or implicit) - independent of RECAP detection
-        has_task_timings = False
-        
-        # Check for explicit TASKS RECAP section
-        if 'TASKS RECAP' in chunk:
-            has_task_timings = True
-            timing_pattern = r'^([^-]+?)\s*-+\s*([\d\.]+)s'
-            task_timings = re.findall(timing_pattern, chunk, re.MULTILINE)
-        
-        # Check for implicit TASKS RECAP (after ===============================================================================)
-        elif '===============================================================================' in chunk:
-            has_task_timings = True
-            # Split the chunk by the equals line and process the part after it
-            parts = chunk.split('===============================================================================')
-            if len(parts) > 1:
-                tasks_section = parts[-1]  # Get the last part after the equals line
-                # Pattern for task lines: task_name followed by dashes and time
-                timing_pattern = r'^([^-]+?)\s*-+\s*([\d\.]+)s'
-                task_timings = re.findall(timing_pattern, tasks_section, re.MULTILINE)
-            else:
-                task_timings = []
-        
-        if has_task_timings:
-            for task_name, duration in task_timings:
-                metadata['task_timings'].append({
-                    'task': task_name.strip(),
-                    'duration_seconds': float(duration)
-                })
-                
-            # Sort by duration (longest first) for priority analysis
-            metadata['task_timings'].sort(key=lambda x: x['duration_seconds'], reverse=True)
+        # Extract task timings from TASKS RECAP section (explicit, or implicit
+        # after the ===== line) - independent of RECAP detection.
+        # Sorted by duration (longest first) for priority analysis
+        if scan.has_tasks_recap or scan.has_recap_rule:
+            metadata['task_timings'] = parse_task_timings(chunk, explicit=scan.has_tasks_recap)
         
         # Standard chunk processing (existing logic) - only if not a RECAP chunk
         if metadata['chunk_type'] != 'RECAP':
-            
-            # Extract playbook/play name
-            playbook_match = re.search(r'PLAY \[(.*?)\]', chunk)
-            if playbook_match:
-                metadata['playbook_name'] = playbook_match.group(1)
-            
-            # Extract ALL task names (not just the first one)
-            task_matches = re.findall(r'TASK \[(.*?)\]', chunk)
-            if task_matches:
-                metadata['task_names'] = task_matches
-        
-        # Extract all host information (improved with case-insensitive patterns)
-        host_patterns = [
-            r'(?i)(?:ok|changed|failed|skipping|unreachable|fatal): \[([\w\.\-]+)\]',
-            r'(?i)FAILED - RETRYING: \[([\w\.\-]+)\]',
-            r'(?i)UNREACHABLE! \[([\w\.\-]+)\]'
-        ]
-        
-        host_matches = []
-        for pattern in host_patterns:
-            matches = re.findall(pattern, chunk)
-            host_matches.extend(matches)
+            metadata['playbook_name'] = scan.playbook_name
+            if scan.task_names:
+                metadata['task_names'] = scan.task_names
         
-        if host_matches:
-            metadata['hosts'] = list(set(host_matches))  # Remove duplicates
+        # Extract all host information
+        if scan.hosts:
+            metadata['hosts'] = list(set(scan.hosts))  # Remove duplicates
         
         # Extract ALL status and error information (comprehensive extraction)
-        status_patterns = [
-            (r'(?i)FAILED!', 'FAILED', 'TASK_FAILED'),
-            (r'(?i)UNREACHABLE!', 'UNREACHABLE', 'HOST_UNREACHABLE'),
-            (r'(?i)FAILED - RETRYING', 'RETRYING', 'RETRY_FAILURE'),
-            (r'(?i)changed:', 'CHANGED', None),
-            (r'(?i)ok:', 'OK', None),
-            (r'(?i)skipping:', 'SKIPPING', None),
-            (r'(?i)included:', 'INCLUDED', None)
-        ]
-        
-        for pattern, status_name, error_type in status_patterns:
-            matches = re.findall(pattern, chunk)
-            if matches:
+        for status_name, error_type in STATUS_ORDER:
+            count = scan.status_counts.get(status_name)
+            if count:
                 # Add status for each occurrence
-                metadata['statuses'].extend([status_name] * len(matches))
+                metadata['statuses'].extend([status_name] * count)
                 
                 # Track errors
                 if error_type:
                     metadata['has_error'] = True
-                    metadata['error_types'].extend([error_type] * len(matches))
-        
-        # Extract ALL retry counts
-        retry_matches = re.findall(r'(?i)FAILED - RETRYING:.*\((\d+) retries left\)', chunk)
-        if retry_matches:
-            metadata['retry_counts'] = [int(count) for count in retry_matches]
-        
-        # Extract ALL timestamps (multiple formats)
-        timestamp_patterns = [
-            r'([A-Za-z]+ \d+ [A-Za-z]+ \d{4}\s+\d{2}:\d{2}:\d{2})',
-            r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})',
-            r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'
-        ]
-        
-        for pattern in timestamp_patterns:
-            timestamps = re.findall(pattern, chunk)
-            metadata['timestamps'].extend(timestamps)
+                    metadata['error_types'].extend([error_type] * count)
         
-        # Extract ALL durations
-        duration_matches = re.findall(r'\((\d+:\d{2}:\d{2}\.\d+)\)', chunk)
-        if duration_matches:
-            metadata['durations'] = duration_matches
+        # Extract ALL retry counts, timestamps (multiple formats) and durations
+        if scan.retry_counts:
+            metadata['retry_counts'] = scan.retry_counts
+        metadata['timestamps'] = scan.timestamps
+        if scan.durations:
+            metadata['durations'] = scan.durations
         
         metadata_chunks.append(metadata)
     
@@ -292,17 +416,40 @@ def create_specialized_splitters():
     return alert_splitter, context_splitter, error_splitter
 
 
-def process_ansible_logs_for_monitoring(log_text: str) -> Dict[str, Any]:
+def get_specialized_splitters():
+    """
+    Return the process-wide (alert, context, error) langchain splitters.
+    
+    Built and warmed up on first use, then shared across calls and threads;
+    the warmup time is recorded in default_registry.warmup_seconds['langchain'].
+    
+    Returns:
+        Tuple of (alert_splitter, context_splitter, error_splitter)
+    """
+    return default_registry.get('langchain', _build_warm_splitters)
+
+
+def _build_warm_splitters():
+    splitters = create_specialized_splitters()
+    process_ansible_logs_for_monitoring(WARMUP_LOG, splitters=splitters)
+    return splitters
+
+
+def process_ansible_logs_for_monitoring(log_text: str, splitters=None) -> Dict[str, Any]:
     """
     Process Ansible logs for the monitoring system with different chunking strategies.
     
     Args:
         log_text: Raw Ansible log content
+        splitters: Optional (alert, context, error) splitters; defaults to
+                   the shared get_specialized_splitters() instances
         
     Returns:
         Dictionary with processed chunks for different use cases
     """
-    alert_splitter, context_splitter, error_splitter = create_specialized_splitters()
+    if splitters is None:
+        splitters = get_specialized_splitters()
+    alert_splitter, context_splitter, error_splitter = splitters
     
     # Split using different strategies
     alert_chunks = alert_splitter.split_text(log_text)
@@ -329,93 +476,31 @@ def process_ansible_logs_for_monitoring(log_text: str) -> Dict[str, Any]:
     }
 
 
-def create_alert_patterns_from_metadata(metadata_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+def create_alert_patterns_from_metadata(metadata_chunks: List[Dict[str, Any]],
+                                        engine: AlertRuleEngine = None) -> Dict[str, Any]:
     """
     Generate alert patterns based on processed chunk metadata (supports PRD requirements).
     
     Args:
         metadata_chunks: List of metadata dictionaries from chunk processing
+        engine: Compiled alert rules; defaults to get_default_alert_engine()
+                (DEFAULT_ALERT_RULES plus any ANSIBLE_ALERT_RULES file)
         
     Returns:
         Dictionary of alert patterns for the monitoring system
     """
-    alert_patterns = {
-        'playbook_completion_summary': {
-            'condition': lambda m: m.get('chunk_type') == 'RECAP',
-            'severity': 'info',
-            'description': 'Playbook execution completed with summary statistics',
-            'natural_language': 'Notify when playbook completes and provide summary statistics'
-        },
-        'recap_with_failures': {
-            'condition': lambda m: (m.get('chunk_type') == 'RECAP' and 
-                                  m.get('has_error') and 
-                                  any(error in m.get('error_types', []) for error in ['TASK_FAILED_SUMMARY', 'HOST_UNREACHABLE_SUMMARY'])),
-            'severity': 'critical',
-            'description': 'Playbook completed but has failed or unreachable hosts',
-            'natural_language': 'Critical alert when playbook summary shows failures or unreachable hosts'
-        },
-        'long_running_tasks': {
-            'condition': lambda m: (m.get('chunk_type') == 'RECAP' and 
-                                  m.get('task_timings') and
-                                  any(t['duration_seconds'] > 300 for t in m.get('task_timings', []))),
-            'severity': 'medium',
-            'description': 'Tasks took longer than 5 minutes to complete',
-            'natural_language': 'Alert when tasks exceed normal execution time baselines'
-        },
-        'unreachable_hosts': {
-            'condition': lambda m: 'HOST_UNREACHABLE' in m.get('error_types', []),
-            'severity': 'critical',
-            'description': 'Host became unreachable during Ansible execution',
-            'natural_language': 'Page me if any host shows UNREACHABLE status'
-        },
-        'failed_tasks': {
-            'condition': lambda m: 'TASK_FAILED' in m.get('error_types', []),
-            'severity': 'high',
-            'description': 'Ansible task execution failed',
-            'natural_language': 'Alert when Ansible tasks fail'
-        },
-        'retry_failures': {
-            'condition': lambda m: ('RETRY_FAILURE' in m.get('error_types', []) and 
-                                   any(count < 3 for count in m.get('retry_counts', []))),
-            'severity': 'medium', 
-            'description': 'Task is retrying with few attempts remaining',
-            'natural_language': 'Notify if task retries are running low'
-        },
-        'multiple_task_failures': {
-            'condition': lambda m: (len([s for s in m.get('statuses', []) if s in ['FAILED', 'UNREACHABLE']]) > 1),
-            'severity': 'critical',
-            'description': 'Multiple tasks failed in the same execution block',
-            'natural_language': 'Critical alert when multiple tasks fail in sequence'
-        },
-        'mixed_statuses': {
-            'condition': lambda m: (len(set(m.get('statuses', []))) > 2 and 'FAILED' in m.get('statuses', [])),
-            'severity': 'medium',
-            'description': 'Mixed success and failure statuses in task execution',
-            'natural_language': 'Alert when task block has mixed success/failure results'
-        },
-        'playbook_duration_anomaly': {
-            'condition': lambda m: (m.get('playbook_name') and 
-                                   len(m.get('durations', [])) > 0),
-            'severity': 'low',
-            'description': 'Playbook execution time may exceed baseline',
-            'natural_language': 'Alert if playbook duration exceeds normal baseline'
-        }
-    }
+    if engine is None:
+        engine = get_default_alert_engine()
     
-    # Apply patterns to find matching chunks
+    # Apply all rules to every chunk in one pass
     triggered_alerts = {}
-    for pattern_name, pattern_config in alert_patterns.items():
-        matching_chunks = [
-            chunk for chunk in metadata_chunks 
-            if pattern_config['condition'](chunk)
-        ]
-        
-        if matching_chunks:
-            triggered_alerts[pattern_name] = {
-                'pattern': pattern_config,
-                'triggered_by': matching_chunks,
-                'count': len(matching_chunks)
-            }
+    patterns = {rule.name: rule.pattern for rule in engine.rules}
+    for pattern_name, matching_chunks in engine.evaluate(metadata_chunks).items():
+        triggered_alerts[pattern_name] = {
+            'pattern': patterns[pattern_name],
+            'triggered_by': matching_chunks,
+            'count': len(matching_chunks)
+        }
     
     return triggered_alerts
 
@@ -466,6 +551,7 @@ if __name__ == "__main__":
     #Process logs for monitoring
     monitoring_results = process_ansible_logs_for_monitoring(text)
     print(monitoring_results)
+    print(f"Splitter warmup: {default_registry.warmup_seconds['langchain'] * 1000:.1f} ms (once per process)")
 
     # Create alert patterns from metadata
     alert_patterns = create_alert_patterns_from_metadata(monitoring_results['context_analysis']['metadata'])
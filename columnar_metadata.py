@@ -0,0 +1,268 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # Columnar output is optional; the dict path needs no NumPy
+    np = None
+
+from ansible_scanner import STATUS_ORDER
+
+# Code tables for the fixed vocabularies
+CHUNK_TYPES = ('standard', 'RECAP')
+# OTHER counts statuses outside this vocabulary instead of rejecting them
+STATUS_COLUMNS = tuple(status for status, _ in STATUS_ORDER) + ('SUMMARY', 'OTHER')
+ERROR_TYPE_BITS = {
+    'TASK_FAILED': 1 << 0,
+    'HOST_UNREACHABLE': 1 << 1,
+    'RETRY_FAILURE': 1 << 2,
+    'TASK_FAILED_SUMMARY': 1 << 3,
+    'HOST_UNREACHABLE_SUMMARY': 1 << 4,
+}
+
+_CHUNK_TYPE_CODES = {name: code for code, name in enumerate(CHUNK_TYPES)}
+_STATUS_INDEX = {name: index for index, name in enumerate(STATUS_COLUMNS)}
+_OTHER_STATUS = _STATUS_INDEX['OTHER']
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Columnar metadata requires NumPy: pip install numpy")
+
+
+class RaggedColumn:
+    """
+    Variable-length column stored as offsets + flat values.
+
+    Row i is values[offsets[i]:offsets[i + 1]]. String columns are
+    dictionary-encoded: values holds int32 codes into vocabulary.
+    """
+
+    __slots__ = ('offsets', 'values', 'vocabulary')
+
+    def __init__(self, offsets, values, vocabulary: Optional[List[str]] = None):
+        self.offsets = offsets
+        self.values = values
+        self.vocabulary = vocabulary
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], strings: bool) -> "RaggedColumn":
+        lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if not strings:
+            values = np.fromiter((item for row in rows for item in row), dtype=np.int64, count=int(offsets[-1]))
+            return cls(offsets, values)
+        codes: Dict[str, int] = {}
+        values = np.fromiter(
+            (codes.setdefault(item, len(codes)) for row in rows for item in row),
+            dtype=np.int32, count=int(offsets[-1])
+        )
+        return cls(offsets, values, list(codes))
+
+    def row(self, index: int) -> List[Any]:
+        """Decode one row back into a Python list."""
+        items = self.values[self.offsets[index]:self.offsets[index + 1]]
+        if self.vocabulary is None:
+            return items.tolist()
+        return [self.vocabulary[code] for code in items]
+
+    def lengths(self):
+        """Number of items in every row."""
+        return np.diff(self.offsets)
+
+    def row_ids(self):
+        """Row index of every flat value, for grouping values by chunk."""
+        return np.repeat(np.arange(len(self.offsets) - 1), self.lengths())
+
+    @classmethod
+    def concat(cls, columns: Sequence["RaggedColumn"]) -> "RaggedColumn":
+        strings = columns[0].vocabulary is not None
+        offsets = [np.zeros(1, dtype=np.int64)]
+        values = []
+        codes: Dict[str, int] = {}
+        base = 0
+        for column in columns:
+            offsets.append(column.offsets[1:] + base)
+            base += int(column.offsets[-1])
+            if strings:
+                # Re-map each column's codes into the shared vocabulary
+                remap = np.array([codes.setdefault(item, len(codes)) for item in column.vocabulary], dtype=np.int32)
+                values.append(remap[column.values] if len(column.values) else column.values)
+            else:
+                values.append(column.values)
+        dtype = np.int32 if strings else np.int64
+        return cls(
+            np.concatenate(offsets),
+            np.concatenate(values) if values else np.zeros(0, dtype=dtype),
+            list(codes) if strings else None
+        )
+
+
+class ColumnarMetadata:
+    """
+    Struct-of-arrays view of chunk metadata for vectorized aggregation.
+
+    Fixed-width columns are NumPy arrays with one entry per chunk:
+        job_ids, chunk_index, start, end (-1 when the splitter gave no
+        offsets), has_error, error_mask (ERROR_TYPE_BITS), chunk_type
+        (codes into CHUNK_TYPES), playbook (codes into playbooks, -1 = none)
+        and status_counts (chunks x STATUS_COLUMNS, unknown statuses under
+        OTHER).
+    hosts, task_names and retry_counts are RaggedColumn objects.
+    """
+
+    COLUMNS = (
+        'job_ids', 'chunk_index', 'start', 'end', 'has_error', 'error_mask',
+        'chunk_type', 'playbook', 'status_counts',
+    )
+
+    def __init__(self, jobs: List[str], playbooks: List[str], hosts: RaggedColumn,
+                 task_names: RaggedColumn, retry_counts: RaggedColumn, **columns):
+        self.jobs = jobs
+        self.playbooks = playbooks
+        self.hosts = hosts
+        self.task_names = task_names
+        self.retry_counts = retry_counts
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        rows = len(self.chunk_index)
+        for name in self.COLUMNS:
+            if len(columns[name]) != rows:
+                raise ValueError(f"Column {name!r} has {len(columns[name])} rows, expected {rows}")
+        for name in ('hosts', 'task_names', 'retry_counts'):
+            if len(getattr(self, name).offsets) - 1 != rows:
+                raise ValueError(f"Column {name!r} has {len(getattr(self, name).offsets) - 1} rows, expected {rows}")
+
+    def __len__(self) -> int:
+        return len(self.chunk_index)
+
+    @classmethod
+    def concat(cls, parts: Sequence["ColumnarMetadata"]) -> "ColumnarMetadata":
+        """
+        Stack columnar results from several jobs into one.
+
+        Args:
+            parts: ColumnarMetadata objects, e.g. one per job
+
+        Returns:
+            ColumnarMetadata with job and playbook codes re-mapped
+        """
+        _require_numpy()
+        jobs: Dict[str, int] = {}
+        playbooks: Dict[str, int] = {}
+        job_ids, playbook_codes = [], []
+        for part in parts:
+            job_map = np.array([jobs.setdefault(job, len(jobs)) for job in part.jobs], dtype=np.int32)
+            job_ids.append(job_map[part.job_ids] if len(part.jobs) else part.job_ids)
+            playbook_map = np.array(
+                [playbooks.setdefault(name, len(playbooks)) for name in part.playbooks] + [-1], dtype=np.int32
+            )
+            # Index -1 (no playbook) lands on the trailing -1 entry
+            playbook_codes.append(playbook_map[part.playbook])
+
+        columns = {
+            name: np.concatenate([getattr(part, name) for part in parts])
+            for name in cls.COLUMNS if name not in ('job_ids', 'playbook')
+        }
+        return cls(
+            jobs=list(jobs),
+            playbooks=list(playbooks),
+            hosts=RaggedColumn.concat([part.hosts for part in parts]),
+            task_names=RaggedColumn.concat([part.task_names for part in parts]),
+            retry_counts=RaggedColumn.concat([part.retry_counts for part in parts]),
+            job_ids=np.concatenate(job_ids),
+            playbook=np.concatenate(playbook_codes),
+            **columns
+        )
+
+    def status_totals(self) -> Dict[str, int]:
+        """Total occurrences of every status across all chunks."""
+        return dict(zip(STATUS_COLUMNS, self.status_counts.sum(axis=0).tolist()))
+
+    def error_rate_by_job(self) -> Dict[str, float]:
+        """Share of chunks with has_error set, per job."""
+        chunks = np.bincount(self.job_ids, minlength=len(self.jobs))
+        errors = np.bincount(self.job_ids, weights=self.has_error, minlength=len(self.jobs))
+        rates = np.divide(errors, chunks, out=np.zeros(len(self.jobs)), where=chunks > 0)
+        return dict(zip(self.jobs, rates.tolist()))
+
+    def chunks_with_error_type(self, error_type: str):
+        """Indices of chunks whose error_mask includes error_type."""
+        return np.flatnonzero(self.error_mask & ERROR_TYPE_BITS[error_type])
+
+
+def _counted(metadata: Dict[str, Any], counts_key: str, list_key: str) -> Iterable:
+    """(name, count) pairs from a counter field, or from its list form."""
+    counts = metadata.get(counts_key)
+    if counts is not None:
+        return counts.items()
+    return ((name, 1) for name in metadata[list_key])
+
+
+def to_columnar(metadata_chunks: Iterable[Dict[str, Any]], job_id: str = "") -> ColumnarMetadata:
+    """
+    Convert metadata dictionaries into a ColumnarMetadata.
+
+    Works with the output of both extract_ansible_metadata_from_chonkie_chunks
+    (with or without counters) and extract_ansible_metadata_from_chunks, and
+    with ChunkMetadata records.
+
+    Args:
+        metadata_chunks: Metadata dictionaries for one job
+        job_id: Label stored for every row, used when jobs are concatenated
+
+    Returns:
+        ColumnarMetadata for the chunks
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    _require_numpy()
+    metadata_chunks = list(metadata_chunks)
+    count = len(metadata_chunks)
+
+    chunk_index = np.empty(count, dtype=np.int32)
+    start = np.full(count, -1, dtype=np.int64)
+    end = np.full(count, -1, dtype=np.int64)
+    has_error = np.zeros(count, dtype=bool)
+    error_mask = np.zeros(count, dtype=np.uint8)
+    chunk_type = np.zeros(count, dtype=np.uint8)
+    playbook = np.full(count, -1, dtype=np.int32)
+    status_counts = np.zeros((count, len(STATUS_COLUMNS)), dtype=np.int32)
+    playbooks: Dict[str, int] = {}
+
+    for row, metadata in enumerate(metadata_chunks):
+        chunk_index[row] = metadata['chunk_index']
+        if metadata.get('chonkie_start') is not None:
+            start[row] = metadata['chonkie_start']
+            end[row] = metadata['chonkie_end']
+        has_error[row] = metadata['has_error']
+        chunk_type[row] = _CHUNK_TYPE_CODES.get(metadata['chunk_type'], 0)
+        if metadata['playbook_name'] is not None:
+            playbook[row] = playbooks.setdefault(metadata['playbook_name'], len(playbooks))
+
+        mask = 0
+        for error_type, _ in _counted(metadata, 'error_type_counts', 'error_types'):
+            mask |= ERROR_TYPE_BITS.get(error_type, 0)
+        error_mask[row] = mask
+
+        counts = status_counts[row]
+        for status, occurrences in _counted(metadata, 'status_counts', 'statuses'):
+            counts[_STATUS_INDEX.get(status, _OTHER_STATUS)] += occurrences
+
+    return ColumnarMetadata(
+        jobs=[job_id],
+        playbooks=list(playbooks),
+        hosts=RaggedColumn.from_rows([m['hosts'] for m in metadata_chunks], strings=True),
+        task_names=RaggedColumn.from_rows([m['task_names'] for m in metadata_chunks], strings=True),
+        retry_counts=RaggedColumn.from_rows([m['retry_counts'] for m in metadata_chunks], strings=False),
+        job_ids=np.zeros(count, dtype=np.int32),
+        chunk_index=chunk_index,
+        start=start,
+        end=end,
+        has_error=has_error,
+        error_mask=error_mask,
+        chunk_type=chunk_type,
+        playbook=playbook,
+        status_counts=status_counts,
+    )
@@ -0,0 +1,150 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple, Union
+
+from ansible_lexer import (
+    _MARKER_BODY, LogSpan,
+    PREAMBLE, PLAY, TASK, HANDLER, TIMING, HOST_RESULT, FATAL, UNREACHABLE,
+    RETRY, ERROR, PLAY_RECAP, HOST_STATS, TASKS_RECAP,
+)
+
+# Lines that are not markers: continuation lines, JSON bodies, blank lines
+OTHER = "OTHER"
+# The 79 '=' rule that opens the task timing list (with or without TASKS RECAP)
+RULE = "RULE"
+
+# Line kind for every small-int code stored in LineIndex.kinds
+LINE_KINDS: Tuple[str, ...] = (
+    OTHER, PLAY, TASK, HANDLER, TIMING, HOST_RESULT, FATAL, UNREACHABLE,
+    RETRY, ERROR, PLAY_RECAP, HOST_STATS, TASKS_RECAP, RULE,
+)
+KIND_CODES: Dict[str, int] = {kind: code for code, kind in enumerate(LINE_KINDS)}
+KIND_CODES[PREAMBLE] = KIND_CODES[OTHER]
+
+# Matches (empty or not) at every line start; the named group that matched,
+# if any, is the line kind: the lexer's markers, then the timing rule
+_LINE_BODY = r"^(?:" + _MARKER_BODY + r"|(?P<RULE>={79}))?"
+_LINE = re.compile(_LINE_BODY, re.MULTILINE | re.VERBOSE)
+_LINE_BYTES = re.compile(_LINE_BODY.encode(), re.MULTILINE | re.VERBOSE)
+
+
+class LineIndex:
+    """
+    Per-line classification of a log, built once and queried many times.
+
+    starts holds the offset of every line (array of int64) and kinds its
+    code into LINE_KINDS (bytearray), so "which lines are fatal" or "where
+    does PLAY RECAP start" is a C-level scan or a bisect instead of a regex
+    pass over the text. Offsets are in the units of the indexed text
+    (characters for str, bytes for bytes/mmap).
+    """
+
+    __slots__ = ("starts", "kinds", "length")
+
+    def __init__(self, starts: array, kinds: bytearray, length: int):
+        self.starts = starts
+        self.kinds = kinds
+        self.length = length
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        """Line number containing offset."""
+        return bisect_right(self.starts, offset) - 1
+
+    def line_span(self, line: int) -> Tuple[int, int]:
+        """[start, end) of a line, including its newline."""
+        end = self.starts[line + 1] if line + 1 < len(self.starts) else self.length
+        return self.starts[line], end
+
+    def kind_of(self, line: int) -> str:
+        return LINE_KINDS[self.kinds[line]]
+
+    def count(self, kind: str, start_line: int = 0, end_line: Optional[int] = None) -> int:
+        """Number of lines of a kind, optionally within [start_line, end_line)."""
+        end_line = len(self.kinds) if end_line is None else end_line
+        return self.kinds.count(KIND_CODES[kind], start_line, end_line)
+
+    def first(self, kind: str, start_line: int = 0) -> Optional[int]:
+        """First line of a kind at or after start_line, or None."""
+        line = self.kinds.find(KIND_CODES[kind], start_line)
+        return None if line < 0 else line
+
+    def lines_of(self, kind: str) -> List[int]:
+        """All line numbers of a kind, in order."""
+        code = KIND_CODES[kind]
+        lines = []
+        line = self.kinds.find(code)
+        while line >= 0:
+            lines.append(line)
+            line = self.kinds.find(code, line + 1)
+        return lines
+
+    def offsets_of(self, kind: str) -> List[int]:
+        """Start offsets of all lines of a kind."""
+        return [self.starts[line] for line in self.lines_of(kind)]
+
+    def lines_between(self, start: int, end: int) -> Tuple[int, int]:
+        """[first, last) line range overlapping the offset range [start, end)."""
+        if end <= start:
+            line = self.line_of(start)
+            return line, line
+        return self.line_of(start), self.line_of(end - 1) + 1
+
+    def kind_counts(self, start: int, end: int) -> Dict[str, int]:
+        """
+        Line counts per kind for the lines starting in [start, end), e.g. one chunk.
+
+        A line cut by a chunk boundary counts for the chunk holding its start,
+        so counts over consecutive chunks add up to the whole log's.
+        """
+        window = self.kinds[bisect_left(self.starts, start):bisect_left(self.starts, end)]
+        return {LINE_KINDS[code]: window.count(code) for code in set(window)}
+
+    def spans(self) -> List[LogSpan]:
+        """
+        Rebuild the lexer's span list from the index.
+
+        Returns:
+            The same spans lex_ansible_log returns for the indexed text
+        """
+        spans: List[LogSpan] = []
+        if not self.length:
+            return spans
+        other, rule = KIND_CODES[OTHER], KIND_CODES[RULE]
+        kind = PREAMBLE if self.kinds[0] in (other, rule) else LINE_KINDS[self.kinds[0]]
+        start = 0
+        for offset, code in zip(self.starts[1:], self.kinds[1:]):
+            if code == other or code == rule:
+                continue
+            spans.append(LogSpan(kind, start, offset))
+            kind = LINE_KINDS[code]
+            start = offset
+        spans.append(LogSpan(kind, start, self.length))
+        return spans
+
+
+def build_line_index(text: Union[str, bytes, memoryview]) -> LineIndex:
+    """
+    Classify every line of a log in one pass.
+
+    Args:
+        text: Raw Ansible log content as str or a bytes-like buffer (mmap)
+
+    Returns:
+        LineIndex for the text
+    """
+    starts = array("q")
+    kinds = bytearray()
+    codes = KIND_CODES
+    for match in (_LINE if isinstance(text, str) else _LINE_BYTES).finditer(text):
+        starts.append(match.start())
+        kind = match.lastgroup
+        kinds.append(codes[kind] if kind else 0)
+    # A trailing newline does not open another line
+    if len(starts) > 1 and starts[-1] == len(text):
+        starts.pop()
+        kinds.pop()
+    return LineIndex(starts, kinds, len(text))
@@ -0,0 +1,322 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from chunk_metadata import chunk_source_text
+
+# Placeholder for a token position that varies between lines of a template
+WILDCARD = '<*>'
+
+# Volatile tokens masked before templating, most specific first: two runs
+# of the same config differ in these and little else.
+_MASKS = re.compile('|'.join([
+    r'(?P<TS>[A-Za-z]+ \d+ [A-Za-z]+ \d{4}\s+\d{2}:\d{2}:\d{2}(?: [+-]\d{4})?'
+    r'|\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)',
+    r'(?P<DUR>\d+:\d{2}:\d{2}\.\d+)',
+    r'(?P<IP>\b\d{1,3}(?:\.\d{1,3}){3}\b)',
+    r'(?P<UUID>\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b)',
+    r'(?P<HEX>\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b)',
+    # Random GUID suffixes of host and cluster names (bastion.r7b9g,
+    # cluster-jt55l): after '.' or '-', with a digit followed by a letter,
+    # so words that merely end in a number (host1, node001) are not ids
+    r'(?P<ID>(?<=[.-])(?=[a-z0-9]*\d[a-z])[a-z0-9]{5,}\b)',
+    r'(?P<N>\d+(?:\.\d+)?)',
+]))
+
+
+def mask_volatile_tokens(text: str) -> str:
+    """
+    Replace timestamps, durations, IPs, ids, GUIDs and numbers with placeholders.
+
+    Args:
+        text: Log text
+
+    Returns:
+        Text with e.g. '<TS>', '<ID>', '<N>' in place of volatile tokens
+    """
+    return _MASKS.sub(lambda match: f'<{match.lastgroup}>', text)
+
+
+# Masked value placeholders inside a template token
+_PLACEHOLDER = re.compile(r'<(?:' + '|'.join(_MASKS.groupindex) + r')>')
+_TOKEN = re.compile(r'\S+')
+
+
+def _mask_tokens(line: str) -> Tuple[List[str], List[str], List[List[str]]]:
+    """
+    Mask a whole line, then split it into tokens.
+
+    Masking first keeps values that contain spaces (timestamps) as one
+    <TS> token. Returns the masked tokens and, per token, the raw text it
+    came from and the values masked inside it.
+    """
+    # (masked start, masked end, value) of every placeholder
+    placeholders: List[Tuple[int, int, str]] = []
+    pieces = []
+    position = 0
+    shift = 0  # Masked offset minus raw offset
+    for match in _MASKS.finditer(line):
+        placeholder = f'<{match.lastgroup}>'
+        pieces.append(line[position:match.start()])
+        pieces.append(placeholder)
+        start = match.start() + shift
+        placeholders.append((start, start + len(placeholder), match.group()))
+        shift += len(placeholder) - (match.end() - match.start())
+        position = match.end()
+    pieces.append(line[position:])
+    masked = ''.join(pieces)
+
+    tokens: List[str] = []
+    raws: List[str] = []
+    values: List[List[str]] = []
+    # Token edges never fall inside a placeholder (they hold no whitespace),
+    # so raw offset = masked offset minus the shift of the placeholders before it
+    i = 0
+    shift = 0
+    for token in _TOKEN.finditer(masked):
+        while i < len(placeholders) and placeholders[i][1] <= token.start():
+            shift += placeholders[i][1] - placeholders[i][0] - len(placeholders[i][2])
+            i += 1
+        raw_start = token.start() - shift
+        token_values = []
+        while i < len(placeholders) and placeholders[i][1] <= token.end():
+            shift += placeholders[i][1] - placeholders[i][0] - len(placeholders[i][2])
+            token_values.append(placeholders[i][2])
+            i += 1
+        tokens.append(token.group())
+        raws.append(line[raw_start:token.end() - shift])
+        values.append(token_values)
+    return tokens, raws, values
+
+
+class LogTemplate:
+    """One mined line template: tokens with WILDCARD at varying positions."""
+
+    __slots__ = ('id', 'tokens', 'size')
+
+    def __init__(self, template_id: int, tokens: List[str]):
+        self.id = template_id
+        self.tokens = tokens
+        self.size = 0  # Lines matched so far
+
+    @property
+    def template(self) -> str:
+        return ' '.join(self.tokens)
+
+    def __repr__(self) -> str:
+        return f"LogTemplate(id={self.id}, size={self.size}, template={self.template!r})"
+
+
+class TemplatedLine(NamedTuple):
+    """A line rewritten as its template id plus the values that vary."""
+
+    template_id: int
+    params: List[str]         # Wildcard tokens and masked values, in line order
+    tokens: Tuple[str, ...]   # Template tokens as matched (the template may widen later)
+
+    @property
+    def template(self) -> str:
+        """The template this line was matched against."""
+        return ' '.join(self.tokens)
+
+    def render(self) -> str:
+        """The line again, with runs of whitespace between tokens collapsed."""
+        params = iter(self.params)
+        return ' '.join(
+            next(params) if token == WILDCARD else _PLACEHOLDER.sub(lambda _: next(params), token)
+            for token in self.tokens
+        )
+
+
+class TemplateTable:
+    """
+    Drain-style log template miner with a bounded, shared template table.
+
+    Lines are masked (mask_volatile_tokens), tokenized on whitespace and
+    bucketed by token count and first token. In its bucket a line joins the
+    template sharing the largest fraction of tokens if that is at least
+    similarity; positions that differ become WILDCARD. Otherwise it starts a
+    new template. Template ids are assigned once and never reused; at most
+    max_templates are kept, dropping the least recently matched. One table
+    can be shared by every job (and thread), so the same log structure gets
+    the same id everywhere.
+    """
+
+    def __init__(self, similarity: float = 0.5, max_templates: int = 10000):
+        """
+        Initialize an empty table.
+
+        Args:
+            similarity: Minimum share of equal tokens for a line to join a template
+            max_templates: Templates kept before the least recently matched is dropped
+        """
+        self.similarity = similarity
+        self.max_templates = max_templates
+        self._templates: "OrderedDict[int, LogTemplate]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, str], List[LogTemplate]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def get(self, template_id: int) -> Optional[LogTemplate]:
+        return self._templates.get(template_id)
+
+    def templates(self) -> List[LogTemplate]:
+        """Current templates, least recently matched first."""
+        return list(self._templates.values())
+
+    def add_line(self, line: str) -> TemplatedLine:
+        """
+        Match (and learn from) one line.
+
+        Args:
+            line: Log line without its newline
+
+        Returns:
+            TemplatedLine with the template id and parameter values
+        """
+        tokens, raws, values = _mask_tokens(line)
+        first = tokens[0] if tokens else ''
+        key = (len(tokens), WILDCARD if any(char.isdigit() for char in first) else first)
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [])
+            template = self._best_match(bucket, tokens)
+            if template is None:
+                template = LogTemplate(self._next_id, list(tokens))
+                self._next_id += 1
+                bucket.append(template)
+                self._templates[template.id] = template
+                if len(self._templates) > self.max_templates:
+                    self._evict()
+            else:
+                for i, (known, token) in enumerate(zip(template.tokens, tokens)):
+                    if known != token:
+                        template.tokens[i] = WILDCARD
+                self._templates.move_to_end(template.id)
+            template.size += 1
+            template_tokens = tuple(template.tokens)
+
+        params: List[str] = []
+        for i, known in enumerate(template_tokens):
+            if known == WILDCARD:
+                params.append(raws[i])
+            else:
+                params.extend(values[i])
+        return TemplatedLine(template.id, params, template_tokens)
+
+    def _best_match(self, bucket: List[LogTemplate], tokens: List[str]) -> Optional[LogTemplate]:
+        if not tokens:
+            return bucket[0] if bucket else None
+        best = None
+        best_score = self.similarity
+        for template in bucket:
+            # Wildcards do not count (as in Drain), so a generic template cannot absorb everything
+            same = sum(1 for known, token in zip(template.tokens, tokens) if known == token)
+            score = same / len(tokens)
+            if score >= best_score and (best is None or score > best_score):
+                best, best_score = template, score
+        return best
+
+    def _evict(self) -> None:
+        _, template = self._templates.popitem(last=False)
+        tokens = template.tokens
+        first = tokens[0] if tokens else ''
+        key = (len(tokens), WILDCARD if any(char.isdigit() for char in first) else first)
+        bucket = self._buckets.get(key)
+        if bucket is not None and template in bucket:
+            bucket.remove(template)
+            if not bucket:
+                del self._buckets[key]
+
+    def templatize(self, text: str) -> List[TemplatedLine]:
+        """
+        Rewrite every line of a text (e.g. one chunk) as template id + parameters.
+
+        Args:
+            text: Log text
+
+        Returns:
+            One TemplatedLine per line
+        """
+        return [self.add_line(line) for line in text.splitlines()]
+
+    def template_text(self, text: str) -> str:
+        """
+        Text with every line replaced by its template.
+
+        Usable as a chunk pre-pass wherever volatile tokens get in the way,
+        e.g. ChunkDeduplicator(normalize=table.template_text). Each line
+        gets the template it matched when it was added, so the result
+        depends on what the table has seen before (and, with a shared
+        table, on other threads): the same text can map to more specific
+        templates early on and wider ones later. Do not use it as a stable
+        key across a table's lifetime.
+
+        Args:
+            text: Log text
+
+        Returns:
+            Template strings, one per line
+        """
+        return '\n'.join(line.template for line in self.templatize(text))
+
+    def template_counts(self, text: str) -> Dict[int, int]:
+        """
+        {template_id: lines} for a text, as a per-chunk metadata feature.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Line count per template id, in first-seen order
+        """
+        counts: Dict[int, int] = {}
+        for line in self.templatize(text):
+            counts[line.template_id] = counts.get(line.template_id, 0) + 1
+        return counts
+
+
+def add_template_features(metadata_chunks: List[Dict], table: Optional["TemplateTable"] = None,
+                          log_text: Optional[str] = None) -> List[Dict]:
+    """
+    Add 'template_counts' ({template_id: lines}) to chunk metadata.
+
+    Args:
+        metadata_chunks: Metadata dictionaries from either extractor, or
+                         ChunkMetadata records
+        table: Template table; defaults to the process-wide one
+        log_text: Full log, needed when chunk_text was not kept
+
+    Returns:
+        The same list, updated in place
+    """
+    if table is None:
+        table = get_default_template_table()
+    for metadata in metadata_chunks:
+        text = chunk_source_text(metadata, log_text)
+        if isinstance(metadata, dict):
+            metadata['template_counts'] = table.template_counts(text)
+        else:  # ChunkMetadata
+            metadata.template_counts = table.template_counts(text)
+    return metadata_chunks
+
+
+_default_table: Optional[TemplateTable] = None
+_default_table_lock = threading.Lock()
+
+
+def get_default_template_table() -> TemplateTable:
+    """
+    Return the process-wide template table, shared across jobs.
+
+    Returns:
+        Shared TemplateTable
+    """
+    global _default_table
+    with _default_table_lock:
+        if _default_table is None:
+            _default_table = TemplateTable()
+    return _default_table
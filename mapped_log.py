@@ -0,0 +1,87 @@
+import mmap
+import os
+from typing import Union
+
+
+class MappedLog:
+    """
+    Read-only, memory-mapped view of a log file.
+
+    The file is never read into a Python str. Lexing runs directly over the
+    mapping and chunk text is decoded only when a caller asks for it, so peak
+    memory stays close to the file size. Offsets are byte offsets.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8", errors: str = "replace"):
+        """
+        Map a log file into memory.
+
+        Args:
+            path: Path to the log file
+            encoding: Encoding used when chunk text is decoded
+            errors: Decoding error handler
+        """
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+        self._file = open(path, "rb")
+        # mmap refuses empty files; an empty bytes object behaves the same
+        if os.fstat(self._file.fileno()).st_size:
+            self.buffer: Union[mmap.mmap, bytes] = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        else:
+            self.buffer = b""
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def text(self, start: int, end: int) -> str:
+        """Decode the bytes in [start, end) on demand."""
+        return self.buffer[start:end].decode(self.encoding, self.errors)
+
+    def close(self) -> None:
+        """Release the mapping; OffsetChunk.text stops working afterwards."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedLog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class OffsetChunk:
+    """
+    Chunk stored as byte offsets into a MappedLog.
+
+    Exposes the same attributes as Chonkie's RecursiveChunk, but text is
+    read from the mapping each time it is accessed instead of being held.
+    """
+
+    __slots__ = ("source", "start_index", "end_index", "level")
+
+    def __init__(self, source: MappedLog, start_index: int, end_index: int, level: int):
+        self.source = source
+        self.start_index = start_index
+        self.end_index = end_index
+        self.level = level
+
+    @property
+    def text(self) -> str:
+        return self.source.text(self.start_index, self.end_index)
+
+    @property
+    def token_count(self) -> int:
+        return self.end_index - self.start_index
+
+    def __len__(self) -> int:
+        return self.end_index - self.start_index
+
+    def __repr__(self) -> str:
+        return (
+            f"OffsetChunk(start_index={self.start_index}, "
+            f"end_index={self.end_index}, level={self.level})"
+        )
@@ -0,0 +1,206 @@
+import re
+from bisect import bisect_right
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# One "FAILED - RETRYING" line, including its newline. Ansible prints the
+# host in brackets; older versions omit it.
+_RETRY_LINE = re.compile(
+    r'FAILED - RETRYING: (?:\[(?P<host>[^\]\n]*)\]: )?(?P<task>[^\n]*?) '
+    r'\((?P<retries_left>\d+) retries left\)[^\n]*(?:\n|$)'
+)
+
+
+class RetryRun(NamedTuple):
+    """A collapsed run of retry lines for one host and task."""
+
+    host: Optional[str]
+    task: str
+    first_retries_left: int
+    last_retries_left: int
+    repetitions: int
+    line_offsets: List[int]   # Start offset of every original line in the run
+    start: int                # Offset of the synthetic record in the collapsed text
+    end: int
+
+
+def format_retry_record(run: RetryRun) -> str:
+    """
+    Render the synthetic line that replaces a retry run.
+
+    The line keeps the "FAILED - RETRYING: [host]: task (N retries left)"
+    shape, with N being the last count, so the scanner and lexer still
+    recognise it and retry_counts reports the attempts that were left.
+    """
+    host = f"[{run.host}]: " if run.host is not None else ""
+    return (
+        f"FAILED - RETRYING: {host}{run.task} ({run.last_retries_left} retries left). "
+        f"[collapsed {run.repetitions} retries: {run.first_retries_left} -> {run.last_retries_left} left]"
+    )
+
+
+class CollapsedLog:
+    """
+    Log text with retry storms collapsed, plus the map back to the original.
+
+    Attributes:
+        text: Collapsed log text
+        runs: RetryRun for every collapsed run, in output order
+        original_length: Length of the original text
+    """
+
+    def __init__(self, text: str, runs: List[RetryRun], original_length: int,
+                 segments: List[Tuple[int, int, int, bool]]):
+        self.text = text
+        self.runs = runs
+        self.original_length = original_length
+        # (collapsed_start, original_start, original_end, verbatim), sorted
+        self._segments = segments
+        self._starts = [segment[0] for segment in segments]
+
+    @property
+    def lines_removed(self) -> int:
+        return sum(run.repetitions - 1 for run in self.runs)
+
+    def to_original(self, offset: int) -> int:
+        """
+        Map an offset in the collapsed text to the original text.
+
+        Offsets inside a synthetic record map to the start of the run's
+        first original line.
+        """
+        index = bisect_right(self._starts, offset) - 1
+        if index < 0:
+            return offset
+        collapsed_start, original_start, original_end, verbatim = self._segments[index]
+        if not verbatim:
+            return original_start
+        return min(original_start + offset - collapsed_start, original_end)
+
+    def original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Map a collapsed [start, end) range, e.g. a chunk, to the original text.
+
+        The range is widened to cover every original line of any retry run
+        it touches. Runs of hosts retrying in parallel interleave in the
+        original, so the segments inside a range are not monotonic.
+        """
+        if end <= start:
+            position = self.to_original(start)
+            return position, position
+        first = max(bisect_right(self._starts, start) - 1, 0)
+        last = bisect_right(self._starts, end - 1) - 1
+        original_start = self.to_original(start)
+        original_end = self.to_original(end - 1) + 1
+        for _, segment_start, segment_end, verbatim in self._segments[first:last + 1]:
+            if not verbatim:
+                original_start = min(original_start, segment_start)
+                original_end = max(original_end, segment_end)
+        for _, segment_start, segment_end, verbatim in self._segments[first + 1:last]:
+            original_start = min(original_start, segment_start)
+            original_end = max(original_end, segment_end)
+        return original_start, original_end
+
+
+def collapse_retry_storms(text: str, min_repetitions: int = 2) -> CollapsedLog:
+    """
+    Collapse consecutive "FAILED - RETRYING" lines into synthetic records.
+
+    Each block of adjacent retry lines is grouped by (host, task), so hosts
+    polling in parallel are collapsed separately. Groups with at least
+    min_repetitions lines become one record (see format_retry_record); the
+    rest of the log is copied verbatim.
+
+    Ordering within a block: each record is placed where its group's first
+    line was, and lines left verbatim stay at their own positions, so
+    [a], [b], [a], [a] becomes the [a] record followed by [b]'s line. The
+    later lines of a collapsed group are the only ones that move.
+
+    Args:
+        text: Raw Ansible log content
+        min_repetitions: Smallest run that is collapsed
+
+    Returns:
+        CollapsedLog with the collapsed text and offset map
+    """
+    pieces: List[str] = []
+    runs: List[RetryRun] = []
+    segments: List[Tuple[int, int, int, bool]] = []
+    collapsed_length = 0
+    copied_to = 0
+
+    def copy(start: int, end: int) -> None:
+        nonlocal collapsed_length
+        if end > start:
+            segments.append((collapsed_length, start, end, True))
+            pieces.append(text[start:end])
+            collapsed_length += end - start
+
+    block: List[re.Match] = []
+
+    def flush_block() -> None:
+        nonlocal collapsed_length, copied_to
+        groups: Dict[Tuple[Optional[str], str], List[re.Match]] = {}
+        for match in block:
+            groups.setdefault((match.group('host'), match.group('task')), []).append(match)
+        if all(len(lines) < min_repetitions for lines in groups.values()):
+            block.clear()
+            return
+
+        block_start, block_end = block[0].start(), block[-1].end()
+        copy(copied_to, block_start)
+        # A collapsed group takes the place of its first line; lines left
+        # verbatim keep their own place
+        items: List[Tuple[int, bool, List[re.Match]]] = []
+        for lines in groups.values():
+            if len(lines) < min_repetitions:
+                items.extend((match.start(), False, [match]) for match in lines)
+            else:
+                items.append((lines[0].start(), True, lines))
+        items.sort(key=lambda item: item[0])
+
+        record = ""
+        for _, collapse, lines in items:
+            if not collapse:
+                record = ""
+                copy(lines[0].start(), lines[0].end())
+                continue
+            host, task = lines[0].group('host'), lines[0].group('task')
+            run = RetryRun(
+                host=host,
+                task=task,
+                first_retries_left=int(lines[0].group('retries_left')),
+                last_retries_left=int(lines[-1].group('retries_left')),
+                repetitions=len(lines),
+                line_offsets=[match.start() for match in lines],
+                start=collapsed_length,
+                end=0,
+            )
+            record = format_retry_record(run) + "\n"
+            run = run._replace(end=collapsed_length + len(record) - 1)
+            segments.append((collapsed_length, lines[0].start(), lines[-1].end(), False))
+            pieces.append(record)
+            collapsed_length += len(record)
+            runs.append(run)
+        # Keep a missing final newline missing; a verbatim last line
+        # already lacks it
+        if record and not text.endswith("\n", block_start, block_end):
+            pieces[-1] = record[:-1]
+            collapsed_length -= 1
+        copied_to = block_end
+        block.clear()
+
+    for match in _RETRY_LINE.finditer(text):
+        # The pattern is unanchored so the regex engine can search for its
+        # literal prefix; only matches at a line start count
+        if match.start() and text[match.start() - 1] != "\n":
+            continue
+        if block and match.start() != block[-1].end():
+            flush_block()
+        block.append(match)
+    if block:
+        flush_block()
+
+    if not runs:
+        return CollapsedLog(text, [], len(text), [(0, 0, len(text), True)])
+    copy(copied_to, len(text))
+    return CollapsedLog("".join(pieces), runs, len(text), segments)
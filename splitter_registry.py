@@ -0,0 +1,71 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class SplitterRegistry:
+    """
+    Process-wide cache of splitter sets, built once and shared.
+
+    Building splitters compiles rules and regexes, which is a noticeable
+    share of the per-job cost when many small logs are processed. Entries are
+    built lazily on first use under a lock, so concurrent threads get the
+    same instance, and the time each build took is kept for reporting.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+        self.warmup_seconds: Dict[str, float] = {}
+
+    def get(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the entry for key, building it with factory on first use.
+
+        Args:
+            key: Registry key, e.g. 'chonkie' or 'langchain'
+            factory: Zero-argument callable that builds the entry
+
+        Returns:
+            The cached entry
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                started = time.perf_counter()
+                entry = factory()
+                self.warmup_seconds[key] = time.perf_counter() - started
+                self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        """Drop all cached entries and their warmup timings."""
+        with self._lock:
+            self._entries.clear()
+            self.warmup_seconds.clear()
+
+
+# Shared by the process_* entry points of both splitter modules
+default_registry = SplitterRegistry()
+
+# Small log run through freshly built splitters so regex compilation and
+# other first-call costs are paid during warmup rather than by the first job
+WARMUP_LOG = """PLAY [Warmup] ******************************************************************
+
+TASK [Gathering Facts] *********************************************************
+Friday 18 July 2025  17:59:00 +0000 (0:00:00.012)       0:00:00.012 ***********
+ok: [localhost]
+FAILED - RETRYING: [localhost]: Wait for completion (3 retries left).
+fatal: [localhost]: FAILED! => {"changed": false, "msg": "warmup"}
+
+PLAY RECAP *********************************************************************
+localhost                  : ok=1    changed=0    unreachable=0    failed=1    skipped=0    rescued=0    ignored=0
+
+TASKS RECAP ********************************************************************
+===============================================================================
+Gathering Facts --------------------------------------------------------- 1.00s
+"""
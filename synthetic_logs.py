@@ -0,0 +1,267 @@
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional
+
+# Vocabulary the generated play and task names are drawn from
+_PLAY_NAMES = [
+    "Set Action", "Setup runtime", "Setup Output Directory", "Pre Infrastructure",
+    "Infrastructure", "Post Infrastructure", "Pre Software", "Software",
+    "Post Software", "Deploy Workloads", "Validate Deployment",
+]
+_ROLES = [
+    "agnosticd_restore_output_dir", "infra-ec2-create-inventory", "create_ssh_provision_key",
+    "bastion-lite", "common", "set_env_authorized_key", "ocp4_workload_cluster", None, None,
+]
+_VERBS = ["Ensure", "Create", "Install", "Gather", "Wait for", "Configure", "Copy", "Check", "Set"]
+_OBJECTS = [
+    "output_dir", "EC2 instances", "SSH keys", "bastion proxy config", "collections",
+    "requirements.yml", "cluster admin", "user-info.yaml", "k8s interpreter venv",
+    "installer completion", "console URL", "package repositories",
+]
+_FAILURE_MESSAGES = [
+    "Timeout when waiting for the resource",
+    "Could not find or access the requested file",
+    "non-zero return code",
+    "Cluster admin must be created and logged into OpenShift for workloads to be deployed.",
+]
+
+
+def _banner(text: str) -> str:
+    """Header line padded with '*' the way Ansible's default callback does."""
+    return f"{text} {'*' * max(3, 79 - len(text))}\n"
+
+
+def _timing_line(now: datetime, previous: float, elapsed: float) -> str:
+    """profile_tasks line printed under every TASK header."""
+    return (
+        f"{now.strftime('%A %d %B %Y  %H:%M:%S +0000')} ({_format_delta(previous)})"
+        f"       {_format_delta(elapsed)} *********** \n"
+    )
+
+
+def _format_delta(seconds: float) -> str:
+    """H:MM:SS.mmm as printed by profile_tasks."""
+    millis = int(round(seconds * 1000))
+    return f"{millis // 3600000}:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d}.{millis % 1000:03d}"
+
+
+def iter_ansible_log(seed: int = 0, plays: int = 3, tasks_per_play: int = 20, hosts: int = 5,
+                     target_bytes: Optional[int] = None, failure_rate: float = 0.01,
+                     unreachable_rate: float = 0.002, ignore_errors_rate: float = 0.3,
+                     changed_rate: float = 0.3, skip_rate: float = 0.2,
+                     retry_storm_rate: float = 0.02, max_retries: int = 60,
+                     json_result_rate: float = 0.1, tasks_recap: bool = True,
+                     tasks_recap_header: bool = True) -> Iterator[str]:
+    """
+    Generate a realistic Ansible job log piece by piece.
+
+    Output follows ansible-playbook's default callback with profile_tasks
+    enabled: PLAY/TASK banners, timing lines, per-host ok/changed/skipping/
+    fatal results (optionally with multi-line JSON), FAILED - RETRYING storms
+    from hosts polling in parallel, PLAY RECAP and TASKS RECAP. The same seed
+    always produces the same log.
+
+    Args:
+        seed: Random seed
+        plays: Number of plays (ignored when target_bytes is set)
+        tasks_per_play: Tasks in every play
+        hosts: Number of inventory hosts
+        target_bytes: Keep adding plays until the log reaches this size
+        failure_rate: Chance a host fails a task
+        unreachable_rate: Chance a host becomes unreachable on a task
+        ignore_errors_rate: Share of failing tasks with ignore_errors set
+        changed_rate: Chance a successful result is 'changed'
+        skip_rate: Chance a task is skipped on a host
+        retry_storm_rate: Chance a task polls with until/retries
+        max_retries: Retries configured on polling tasks
+        json_result_rate: Chance a result prints an indented JSON body
+        tasks_recap: Emit the TASKS RECAP section
+        tasks_recap_header: Print the "TASKS RECAP" banner (some callback
+                            versions only print the rule line)
+
+    Yields:
+        Log text, one task or section at a time
+    """
+    rng = random.Random(seed)
+    suffix = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(5))
+    inventory = ["localhost"] + [f"node{index:03d}.{suffix}.internal" for index in range(1, hosts)]
+    stats = {host: dict(ok=0, changed=0, unreachable=0, failed=0, skipped=0, rescued=0, ignored=0)
+             for host in inventory}
+    clock = datetime(2025, 7, 18, 17, 59, tzinfo=timezone.utc)
+    elapsed = previous = 0.011
+    task_durations = []
+    written = 0
+
+    yield "Vault password (gpte_vault_0): \n\n"
+    play = 0
+    while (play < plays) if target_bytes is None else (written < target_bytes):
+        # Hosts that fail or become unreachable drop out for the rest of the play
+        active = list(inventory)
+        piece = _banner(f"PLAY [Step {play:04d} {_PLAY_NAMES[play % len(_PLAY_NAMES)]}]") + "\n"
+        written += len(piece)
+        yield piece
+
+        for _ in range(tasks_per_play):
+            if not active:
+                break
+            role = rng.choice(_ROLES)
+            task = f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+            if role:
+                task = f"{role} : {task}"
+            lines: List[str] = [_banner(f"TASK [{task}]"), _timing_line(clock, previous, elapsed)]
+            duration = rng.lognormvariate(-1.5, 1.2)
+            ignore_errors = rng.random() < ignore_errors_rate
+
+            # Hosts polling with until/retries interleave their retry lines
+            if rng.random() < retry_storm_rate:
+                attempts = {host: rng.randint(1, max_retries) for host in active}
+                for attempt in range(max(attempts.values())):
+                    for host in active:
+                        if attempt < attempts[host]:
+                            lines.append(
+                                f"FAILED - RETRYING: [{host}]: {task.split(' : ')[-1]} "
+                                f"({max_retries - attempt} retries left).\n"
+                            )
+                duration += max(attempts.values()) * rng.uniform(5, 15)
+
+            for host in list(active):
+                roll = rng.random()
+                if roll < unreachable_rate:
+                    body = json.dumps({
+                        "changed": False,
+                        "msg": f"Failed to connect to the host via ssh: ssh: connect to host {host} port 22: "
+                               "Connection timed out",
+                        "unreachable": True,
+                    })
+                    lines.append(f"fatal: [{host}]: UNREACHABLE! => {body}\n")
+                    stats[host]['unreachable'] += 1
+                    active.remove(host)
+                elif roll < unreachable_rate + failure_rate:
+                    body = json.dumps({"changed": False, "msg": rng.choice(_FAILURE_MESSAGES)})
+                    lines.append(f"fatal: [{host}]: FAILED! => {body}\n")
+                    if ignore_errors:
+                        lines.append("...ignoring\n")
+                        stats[host]['ignored'] += 1
+                    else:
+                        stats[host]['failed'] += 1
+                        active.remove(host)
+                elif rng.random() < skip_rate:
+                    lines.append(f"skipping: [{host}]\n")
+                    stats[host]['skipped'] += 1
+                else:
+                    changed = rng.random() < changed_rate
+                    status = "changed" if changed else "ok"
+                    stats[host]['ok'] += 1
+                    stats[host]['changed'] += changed
+                    if rng.random() < json_result_rate:
+                        body = json.dumps({
+                            "changed": changed,
+                            "msg": "All assertions passed",
+                            "stdout_lines": [f"line {line}" for line in range(rng.randint(1, 4))],
+                        }, indent=4)
+                        lines.append(f"{status}: [{host}] => {body}\n")
+                    else:
+                        lines.append(f"{status}: [{host}]\n")
+
+            if not active:
+                lines.append("\n" + _banner("NO MORE HOSTS LEFT"))
+            lines.append("\n")
+            piece = "".join(lines)
+            written += len(piece)
+            yield piece
+
+            task_durations.append((task, duration))
+            clock += timedelta(seconds=duration)
+            elapsed += duration
+            previous = duration
+        play += 1
+
+    recap = [_banner("PLAY RECAP")]
+    for host in inventory:
+        counts = stats[host]
+        recap.append(
+            f"{host:<26} : " + " ".join(f"{key}={value:<4}" for key, value in counts.items()) + "\n"
+        )
+    recap.append("\n")
+    if tasks_recap:
+        if tasks_recap_header:
+            recap.append(_banner("TASKS RECAP"))
+        recap.append(_timing_line(clock, previous, elapsed))
+        recap.append("=" * 79 + " \n")
+        for task, duration in sorted(task_durations, key=lambda item: -item[1])[:20]:
+            seconds = f"{duration:.2f}s"
+            recap.append(f"{task} {'-' * max(3, 77 - len(task) - len(seconds))} {seconds}\n")
+    yield "".join(recap)
+
+
+def generate_ansible_log(**options) -> str:
+    """
+    Generate a synthetic Ansible log as one string.
+
+    Args:
+        **options: See iter_ansible_log
+
+    Returns:
+        Log text
+    """
+    return "".join(iter_ansible_log(**options))
+
+
+def write_ansible_log(path: str, **options) -> int:
+    """
+    Stream a synthetic Ansible log to a file without holding it in memory.
+
+    Args:
+        path: Output file path
+        **options: See iter_ansible_log
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    with open(path, 'w') as file:
+        for piece in iter_ansible_log(**options):
+            file.write(piece)
+            written += len(piece)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic Ansible job logs.")
+    parser.add_argument('output', help="Output file")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size-mb', type=float, default=None, help="Grow the log to about this size")
+    parser.add_argument('--plays', type=int, default=3)
+    parser.add_argument('--tasks-per-play', type=int, default=20)
+    parser.add_argument('--hosts', type=int, default=5)
+    parser.add_argument('--failure-rate', type=float, default=0.01)
+    parser.add_argument('--unreachable-rate', type=float, default=0.002)
+    parser.add_argument('--retry-storm-rate', type=float, default=0.02)
+    parser.add_argument('--max-retries', type=int, default=60)
+    parser.add_argument('--json-result-rate', type=float, default=0.1)
+    parser.add_argument('--no-tasks-recap', action='store_true')
+    args = parser.parse_args(argv)
+
+    written = write_ansible_log(
+        args.output,
+        seed=args.seed,
+        plays=args.plays,
+        tasks_per_play=args.tasks_per_play,
+        hosts=args.hosts,
+        target_bytes=int(args.size_mb * 1e6) if args.size_mb else None,
+        failure_rate=args.failure_rate,
+        unreachable_rate=args.unreachable_rate,
+        retry_storm_rate=args.retry_storm_rate,
+        max_retries=args.max_retries,
+        json_result_rate=args.json_result_rate,
+        tasks_recap=not args.no_tasks_recap,
+    )
+    print(f"Wrote {written} bytes to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from bisect import insort
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Quantiles every task baseline tracks
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.5, 0.95)
+
+# Environment variable naming a persisted baseline file for the default engine
+TASK_BASELINES_ENV = 'ANSIBLE_TASK_BASELINES'
+
+_WHITESPACE = re.compile(r'\s+')
+_DIGITS = re.compile(r'\d+')
+
+
+def normalize_task_name(task: str) -> str:
+    """
+    Key under which a task's durations are pooled across jobs.
+
+    Case, whitespace, a trailing '...' (TASKS RECAP truncates long names)
+    and digit runs (step numbers, counts) are normalized, so
+    "Wait for ROSA HCP installer completion" from every run lands in one
+    baseline.
+    """
+    task = _WHITESPACE.sub(' ', task).strip().rstrip('.').strip()
+    return _DIGITS.sub('#', task.lower())
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate in O(1) memory and time (the P-square
+    algorithm, Jain & Chlamtac 1985).
+
+    Keeps five markers whose heights approximate the minimum, p/2, p,
+    (1+p)/2 quantiles and the maximum; the first five observations are
+    kept exactly.
+    """
+
+    __slots__ = ('p', 'count', 'heights', 'positions', 'desired')
+
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights: List[float] = []
+        self.positions = [1.0, 2.0, 3.0, 4.0, 5.0]
+        self.desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+
+    def add(self, value: float) -> None:
+        """Add one observation."""
+        self.count += 1
+        heights = self.heights
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        p = self.p
+        desired = self.desired
+        desired[1] += p / 2
+        desired[2] += p
+        desired[3] += (1 + p) / 2
+        desired[4] += 1
+
+        # Move the middle markers toward their desired positions
+        for i in (1, 2, 3):
+            offset = desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        """Current estimate (None before the first observation)."""
+        if not self.count:
+            return None
+        if self.count <= 5:
+            return self.heights[min(self.count - 1, int(self.p * self.count))]
+        return self.heights[2]
+
+    def to_state(self) -> List[Any]:
+        return [self.p, self.count, self.heights, self.positions, self.desired]
+
+    @classmethod
+    def from_state(cls, state: List[Any]) -> "P2Quantile":
+        estimator = cls(state[0])
+        estimator.count, estimator.heights, estimator.positions, estimator.desired = state[1:]
+        return estimator
+
+
+class TaskBaseline:
+    """Duration history of one normalized task: count, max and quantile sketches."""
+
+    __slots__ = ('count', 'max_seconds', 'quantiles')
+
+    def __init__(self, quantiles: Iterable[float] = DEFAULT_QUANTILES):
+        self.count = 0
+        self.max_seconds = 0.0
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.max_seconds = max(self.max_seconds, seconds)
+        for estimator in self.quantiles.values():
+            estimator.add(seconds)
+
+    def quantile(self, p: float) -> Optional[float]:
+        estimator = self.quantiles.get(p)
+        return None if estimator is None else estimator.value()
+
+
+class TaskBaselineStore:
+    """
+    Per-task duration baselines learned from TASKS RECAP timings.
+
+    Every task (by normalize_task_name) keeps a few P-square quantile
+    sketches, so observing a job is O(1) per task and the store never
+    rescans history. At most max_tasks tasks are kept, dropping the least
+    recently observed. save() writes JSON atomically, like ChunkCache.
+
+    stats counts how verdicts were reached: 'baseline' when the task had
+    enough history, 'fallback' when the fixed fallback threshold was used
+    instead. A store nothing observes only ever reaches fallback verdicts.
+    """
+
+    def __init__(self, quantiles: Iterable[float] = DEFAULT_QUANTILES, min_samples: int = 20,
+                 max_tasks: int = 10000):
+        """
+        Initialize an empty store.
+
+        Args:
+            quantiles: Quantiles tracked per task
+            min_samples: Observations a task needs before its baseline is used
+            max_tasks: Tasks kept before the least recently observed is dropped
+        """
+        self.quantile_levels = tuple(quantiles)
+        self.min_samples = min_samples
+        self.max_tasks = max_tasks
+        self._tasks: "OrderedDict[str, TaskBaseline]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"baseline": 0, "fallback": 0}
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __contains__(self, task: str) -> bool:
+        return normalize_task_name(task) in self._tasks
+
+    def observe(self, task: str, seconds: float) -> None:
+        """Add one task duration."""
+        key = normalize_task_name(task)
+        with self._lock:
+            baseline = self._tasks.get(key)
+            if baseline is None:
+                baseline = self._tasks[key] = TaskBaseline(self.quantile_levels)
+                if len(self._tasks) > self.max_tasks:
+                    self._tasks.popitem(last=False)
+            else:
+                self._tasks.move_to_end(key)
+            baseline.add(seconds)
+
+    def observe_metadata(self, metadata_chunks: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add the task_timings of a job's metadata chunks.
+
+        Args:
+            metadata_chunks: Metadata dictionaries or ChunkMetadata records
+
+        Returns:
+            Number of durations added
+        """
+        added = 0
+        for metadata in metadata_chunks:
+            for timing in metadata.get('task_timings') or ():
+                self.observe(timing['task'], timing['duration_seconds'])
+                added += 1
+        return added
+
+    def baseline(self, task: str, p: float = 0.95) -> Optional[float]:
+        """
+        The p quantile of a task's duration, once it has min_samples.
+
+        Returns:
+            Seconds, or None without enough history
+        """
+        baseline = self._tasks.get(normalize_task_name(task))
+        if baseline is None or baseline.count < self.min_samples:
+            return None
+        return baseline.quantile(p)
+
+    def is_slow(self, task: str, seconds: float, p: float = 0.95,
+                fallback_seconds: Optional[float] = None) -> bool:
+        """
+        Whether a duration is above the task's p quantile.
+
+        Args:
+            task: Task name as printed in TASKS RECAP
+            seconds: Observed duration
+            p: Baseline quantile
+            fallback_seconds: Threshold used without enough history (None:
+                              never slow)
+
+        Returns:
+            True if the duration exceeds the threshold
+        """
+        return self.slow_verdict(task, seconds, p, fallback_seconds) is not None
+
+    def slow_verdict(self, task: str, seconds: float, p: float = 0.95,
+                     fallback_seconds: Optional[float] = None) -> Optional[str]:
+        """
+        Like is_slow, but says which threshold judged the duration slow.
+
+        Args:
+            task: Task name as printed in TASKS RECAP
+            seconds: Observed duration
+            p: Baseline quantile
+            fallback_seconds: Threshold used without enough history
+
+        Returns:
+            'baseline' or 'fallback' if the duration is slow, else None
+        """
+        threshold = self.baseline(task, p)
+        source = 'baseline'
+        if threshold is None:
+            threshold = fallback_seconds
+            source = 'fallback'
+        if threshold is None:
+            return None
+        with self._lock:
+            self.stats[source] += 1
+        return source if seconds > threshold else None
+
+    def save(self, path: str) -> None:
+        """Write the store to a JSON file (atomically)."""
+        with self._lock:
+            data = {
+                'quantiles': list(self.quantile_levels),
+                'min_samples': self.min_samples,
+                'max_tasks': self.max_tasks,
+                'tasks': {
+                    key: [baseline.count, baseline.max_seconds,
+                          [estimator.to_state() for estimator in baseline.quantiles.values()]]
+                    for key, baseline in self._tasks.items()
+                },
+            }
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TaskBaselineStore":
+        """
+        Read a store written by save().
+
+        Args:
+            path: JSON file path
+
+        Returns:
+            TaskBaselineStore with the saved baselines
+        """
+        with open(path, 'r') as file:
+            data = json.load(file)
+        store = cls(data['quantiles'], data['min_samples'], data['max_tasks'])
+        for key, (count, max_seconds, states) in data['tasks'].items():
+            baseline = TaskBaseline(())
+            baseline.count = count
+            baseline.max_seconds = max_seconds
+            for state in states:
+                estimator = P2Quantile.from_state(state)
+                baseline.quantiles[estimator.p] = estimator
+            store._tasks[key] = baseline
+        return store
+
+
+_default_store: Optional[TaskBaselineStore] = None
+
+
+def get_default_baseline_store() -> TaskBaselineStore:
+    """
+    Return the process-wide baseline store.
+
+    Loaded from the file named by ANSIBLE_TASK_BASELINES if it exists,
+    otherwise empty (rules then use their fallback thresholds).
+
+    Returns:
+        Shared TaskBaselineStore
+    """
+    global _default_store
+    if _default_store is None:
+        path = os.environ.get(TASK_BASELINES_ENV)
+        if path and os.path.exists(path):
+            _default_store = TaskBaselineStore.load(path)
+        else:
+            _default_store = TaskBaselineStore()
+    return _default_store
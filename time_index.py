@@ -0,0 +1,207 @@
+import calendar
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:  # Time indexing is optional; the dict path needs no NumPy
+    np = None
+
+# profile_tasks line: "Friday 18 July 2025  21:16:32 +0000 (0:00:00.011)       0:00:00.011 ****"
+_TIMING_LINE = re.compile(
+    r'^[A-Za-z]+ (\d+ [A-Za-z]+ \d{4})\s+(\d{2}):(\d{2}):(\d{2})(?: ([+-])(\d{2})(\d{2}))?'
+    r'(?: \((\d+):(\d{2}):(\d{2}(?:\.\d+)?)\))?(?:\s+(\d+):(\d{2}):(\d{2}(?:\.\d+)?))?',
+    re.MULTILINE,
+)
+
+TimeValue = Union[float, int, datetime]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Time indexing requires NumPy: pip install numpy")
+
+
+def _to_epoch(value: TimeValue) -> float:
+    """Epoch seconds from a number or a datetime (naive datetimes are UTC)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+class TimeIndex:
+    """
+    Task timing lines of one log, parsed once into sorted arrays.
+
+    offsets holds the position of every timing line, epochs its wall-clock
+    time (epoch seconds, UTC), deltas the previous task's duration and
+    elapsed the run time so far (NaN where the line omits them). Offsets
+    are sorted; clock is the running maximum of epochs, so it is sorted
+    too even if the wall clock stepped back, and every lookup is a binary
+    search.
+    """
+
+    __slots__ = ("offsets", "epochs", "deltas", "elapsed", "clock")
+
+    def __init__(self, offsets, epochs, deltas, elapsed):
+        self.offsets = offsets
+        self.epochs = epochs
+        self.deltas = deltas
+        self.elapsed = elapsed
+        self.clock = np.maximum.accumulate(epochs) if len(epochs) else epochs
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def time_at(self, offset: int) -> Optional[float]:
+        """Wall-clock time of the task running at offset (None before the first timing line)."""
+        line = int(np.searchsorted(self.offsets, offset, side='right')) - 1
+        return None if line < 0 else float(self.clock[line])
+
+    def offsets_between(self, start: TimeValue, end: TimeValue) -> "np.ndarray":
+        """Offsets of the timing lines (task starts) within [start, end]."""
+        lo = np.searchsorted(self.clock, _to_epoch(start), side='left')
+        hi = np.searchsorted(self.clock, _to_epoch(end), side='right')
+        return self.offsets[lo:hi]
+
+    def intervals(self, starts, ends):
+        """
+        Map offset ranges (e.g. chunks) to time intervals.
+
+        A range begins when the task running at its start began (text before
+        the first timing line counts from the first one) and ends when the
+        next task after it starts (the last timing line for the log's tail).
+
+        Args:
+            starts: Range start offsets
+            ends: Range end offsets (exclusive)
+
+        Returns:
+            (begin, end) arrays of epoch seconds
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if not len(self.offsets):
+            empty = np.full(len(starts), np.nan)
+            return empty, empty.copy()
+        first = np.searchsorted(self.offsets, starts, side='right') - 1
+        after = np.searchsorted(self.offsets, ends, side='left')
+        last = len(self.offsets) - 1
+        return self.clock[np.maximum(first, 0)], self.clock[np.minimum(after, last)]
+
+    def chunk_times(self, chunks: Iterable[Any]) -> "ChunkTimes":
+        """
+        Map chunks to time intervals.
+
+        Args:
+            chunks: Chunk objects (start_index/end_index) or metadata
+                    dictionaries/records (chunk_index, chonkie_start/chonkie_end)
+
+        Returns:
+            ChunkTimes for the chunks
+        """
+        indexes, starts, ends = [], [], []
+        for position, chunk in enumerate(chunks):
+            if hasattr(chunk, 'start_index'):
+                indexes.append(position)
+                starts.append(chunk.start_index)
+                ends.append(chunk.end_index)
+            else:
+                if chunk.get('chonkie_start') is None:
+                    raise ValueError("Chunk metadata has no offsets; use the Chonkie or offset splitters")
+                indexes.append(chunk['chunk_index'])
+                starts.append(chunk['chonkie_start'])
+                ends.append(chunk['chonkie_end'])
+        begin, end = self.intervals(starts, ends)
+        return ChunkTimes(np.asarray(indexes, dtype=np.int64), begin, end)
+
+
+class ChunkTimes:
+    """
+    Time interval of every chunk of one job, for time-window queries.
+
+    Chunks come in log order and the clock never goes back, so begin and
+    (for non-overlapping chunks) end are sorted and between() is two
+    binary searches; otherwise it falls back to a vectorized mask.
+    """
+
+    __slots__ = ("chunk_index", "begin", "end", "_sorted")
+
+    def __init__(self, chunk_index, begin, end):
+        self.chunk_index = chunk_index
+        self.begin = begin
+        self.end = end
+        self._sorted = bool(np.all(np.diff(begin) >= 0) and np.all(np.diff(end) >= 0))
+
+    def __len__(self) -> int:
+        return len(self.chunk_index)
+
+    def between(self, start: TimeValue, end: TimeValue) -> "np.ndarray":
+        """
+        chunk_index of every chunk whose interval overlaps [start, end].
+
+        Args:
+            start: Window start (epoch seconds or datetime)
+            end: Window end (epoch seconds or datetime)
+
+        Returns:
+            Array of chunk indexes in log order
+        """
+        start, end = _to_epoch(start), _to_epoch(end)
+        if self._sorted:
+            lo = np.searchsorted(self.end, start, side='left')
+            hi = np.searchsorted(self.begin, end, side='right')
+            return self.chunk_index[lo:max(lo, hi)]
+        return self.chunk_index[(self.begin <= end) & (self.end >= start)]
+
+
+def _seconds(hours: Optional[str], minutes: str, seconds: str) -> float:
+    if hours is None:
+        return float('nan')
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def build_time_index(text: str) -> TimeIndex:
+    """
+    Parse every profile_tasks timing line of a log.
+
+    Args:
+        text: Raw Ansible log content
+
+    Returns:
+        TimeIndex for the log
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    _require_numpy()
+    offsets, epochs, deltas, elapsed = [], [], [], []
+    days: Dict[str, Optional[int]] = {}
+    for match in _TIMING_LINE.finditer(text):
+        (date, hour, minute, second, sign, tz_hours, tz_minutes,
+         delta_h, delta_m, delta_s, elapsed_h, elapsed_m, elapsed_s) = match.groups()
+        day = days.get(date, -1)
+        if day == -1:
+            try:
+                day = days[date] = calendar.timegm(datetime.strptime(date, "%d %B %Y").timetuple())
+            except ValueError:  # Not a date after all (e.g. a line of task output)
+                day = days[date] = None
+        if day is None:
+            continue
+        epoch = day + int(hour) * 3600 + int(minute) * 60 + int(second)
+        if sign:
+            tz_offset = int(tz_hours) * 3600 + int(tz_minutes) * 60
+            epoch -= tz_offset if sign == '+' else -tz_offset
+        offsets.append(match.start())
+        epochs.append(epoch)
+        deltas.append(_seconds(delta_h, delta_m, delta_s))
+        elapsed.append(_seconds(elapsed_h, elapsed_m, elapsed_s))
+    return TimeIndex(
+        np.array(offsets, dtype=np.int64),
+        np.array(epochs, dtype=np.float64),
+        np.array(deltas, dtype=np.float64),
+        np.array(elapsed, dtype=np.float64),
+    )